@@ -11,6 +11,14 @@ class KariyerSpider(scrapy.Spider):
     name = 'my_first_kariyer_scraper'
     # List of URLs that Scrapy should start from. A single starting URL is sufficient.
     start_urls = [START_URL]
+    # Links that are already in the database. The crawler loads them once before the bot starts.
+    known_links = frozenset()
+
+    def __init__(self, start_url=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # I can point the bot at another listing (e.g. a local server with recorded pages).
+        if start_url:
+            self.start_urls = [start_url]
     # Main Function 2: What to Do When a Page Loads?
     # This 'parse' method is called when Scrapy successfully downloads a page.
     # The 'response' object contains the entire HTML content of the page. 
@@ -21,6 +29,9 @@ class KariyerSpider(scrapy.Spider):
        # I'm using a CSS Selector to find all the main containers (divs) that hold the posting details.
        # NOTE: We need to make sure this selector is correct for Kariyer.net's current design!
         JOB_CARD_SELECTOR = 'div.list-items > div' 
+        # I count the cards and the ones we already stored, to know if this page is old news.
+        cards_on_page = 0
+        known_on_page = 0
         
         for job_card in response.css(JOB_CARD_SELECTOR):
             
@@ -37,6 +48,11 @@ class KariyerSpider(scrapy.Spider):
             # I am pulling the 'href' attribute to get the unique link.
             link = title_element.attrib.get('href', '')
             item['ad_link'] = response.urljoin(link) # response.urljoin, linki tam (mutlak) URL yapar.
+            cards_on_page += 1
+            # If the ad is already in the database I don't send it again.
+            if item['ad_link'] in self.known_links:
+                known_on_page += 1
+                continue
             # 2. Finding the Company Name
             # The company name is usually in a paragraph (<p>) tag near the title.
             
@@ -54,6 +70,12 @@ class KariyerSpider(scrapy.Spider):
             # 3. Pagination Logic: Finding the Next Page
             # After processing all the ads, I need to find the link to the next page.
             # I'm using CSS Selector to find the 'Next' button/link.
+        # Early stop: listings are newest first, so if every ad on this page is already
+        # stored, the pages after it are old too and I stop paginating here.
+        if cards_on_page and known_on_page == cards_on_page:
+            self.logger.info(f"All {cards_on_page} ads on {response.url} are known, stopping pagination.")
+            return
+
         NEXT_PAGE_SELECTOR = 'div.pagination a.next::attr(href)' 
         next_page_url = response.css(NEXT_PAGE_SELECTOR).get()
                 # If the link actually exists, it means we haven't reached the last page!
@@ -62,4 +84,15 @@ class KariyerSpider(scrapy.Spider):
             # I'm telling Scrapy to visit this new URL.
             # I'm also asking it to call this 'parse' method for the new page.
             # This will automatically continue the bot until it finds the last link.
-            yield response.follow(next_page_url, callback=self.parse)
\ No newline at end of file
+            yield response.follow(next_page_url, callback=self.parse)
+
+        # On a first crawl I also queue every numbered page link I can see, so several
+        # pages are downloaded at the same time instead of one after another.
+        # Scrapy's duplicate filter makes sure each page is still visited only once.
+        # On a re-crawl (known links loaded) I only follow 'next', page by page, so the
+        # early stop above really stops before the old pages are downloaded.
+        if self.known_links:
+            return
+        PAGE_LINKS_SELECTOR = 'div.pagination a::attr(href)'
+        for page_url in response.css(PAGE_LINKS_SELECTOR).getall():
+            yield response.follow(page_url, callback=self.parse)
\ No newline at end of file
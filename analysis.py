@@ -1,9 +1,12 @@
 from dataclasses import dataclass
 from abc import ABC, abstractmethod
-from pymongo import MongoClient
+import hashlib
+import json
 import re
 import logging
 
+from metrics import METRICS
+
 # -------------------------------------------------------
 # LOGGING SETUP
 # -------------------------------------------------------
@@ -22,6 +25,17 @@ class SkillKeyword:
     category: str  # "technical" or "soft"
 
 
+# Extended keywords
+DEFAULT_KEYWORDS: list[SkillKeyword] = [
+    SkillKeyword("python", ["python3", "py"], "technical"),
+    SkillKeyword("sql", ["postgres", "mysql"], "technical"),
+    SkillKeyword("javascript", ["js", "node"], "technical"),
+    SkillKeyword("docker", ["containers"], "technical"),
+    SkillKeyword("communication", ["teamwork", "iletişim"], "soft"),
+    SkillKeyword("problem solving", ["critical thinking"], "soft"),
+]
+
+
 # -------------------------------------------------------
 # 2. Abstract Analyzer Interface
 # -------------------------------------------------------
@@ -34,6 +48,18 @@ class ISkillAnalyzer(ABC):
 # -------------------------------------------------------
 # 3. Cleaner System (Inheritance)
 # -------------------------------------------------------
+# str.lower() maps "İ" to "i" + combining dot and "I" to "i" (Turkish wants "ı").
+# For matching, every dotted/dotless i is folded onto plain "i" instead, in
+# texts and in terms alike, so "İLETİŞİM", "iletişim" and "ILETIŞIM" all meet.
+# Stored text and near-duplicate shingles keep the plain lower() behaviour.
+_FOLD_I = str.maketrans({"İ": "i", "I": "i", "ı": "i", "\u0307": None})
+
+
+def normalize_text(text: str) -> str:
+    """Turkish-aware lowercase used for matching (not for stored text)."""
+    return text.translate(_FOLD_I).lower()
+
+
 class BaseCleaner:
     def clean(self, text: str) -> str:
         return text.lower().strip()
@@ -47,26 +73,243 @@ class SymbolCleaner(BaseCleaner):
         return re.sub(r"[^a-zA-Z0-9ğüşöçıİĞÜŞÖÇ\s-]", " ", base)
 
 
+class MatchCleaner(BaseCleaner):
+    """
+    Cleaning for everything that goes to a SkillMatcher, texts and terms alike:
+    i-folding, symbols to spaces, single spaces. "+" and "#" stay only at the
+    end of a word (c++, c#), so "python+sql" still splits into two words.
+    """
+
+    SYMBOLS = re.compile(r"[^a-zA-Z0-9ğüşöçıİĞÜŞÖÇ\s+#-]|(?<![\w+#])[+#]+|[+#]+(?=\w)")
+
+    def clean(self, text: str) -> str:
+        return " ".join(self.SYMBOLS.sub(" ", normalize_text(text)).split())
+
+
+# -------------------------------------------------------
+# 4. Compiled Skill Matcher (Single Pass)
+# -------------------------------------------------------
+class SkillMatcher:
+    """
+    Compiles every keyword name and synonym into one regex and finds all
+    skills of a text in a single scan.
+
+    The pattern is a zero-width lookahead, so every start position is tried
+    once and overlapping terms are still seen. At a given position the
+    longest term wins; shorter terms that would also match there (e.g.
+    "sql" inside "sql server") are recovered from a precomputed prefix table.
+
+    With `suffixes`, terms of at least `min_stem_length` characters also match
+    with up to three of them attached ("iletişimde", "dockerda"); see taxonomy.py.
+
+    Terms go through MatchCleaner like the texts ("node.js" -> "node js"), and
+    "+" and "#" count as word characters, so "c" is not found inside "c++".
+    """
+
+    _WORD_CHAR = re.compile(r"[\w+#]")
+    # Word boundaries that treat "+" and "#" as word characters
+    _START, _END = r"(?<![\w+#])", r"(?![\w+#])"
+
+    def __init__(self, keywords: list[SkillKeyword], suffixes=(), min_stem_length: int = 4):
+        self.keywords = list(keywords)
+        self.suffixes = tuple(dict.fromkeys(normalize_text(s) for s in suffixes if s))
+        self.min_stem_length = min_stem_length
+
+        # term -> indexes of the keywords it belongs to
+        self._term_skills: dict[str, set[int]] = {}
+        cleaner = MatchCleaner()
+        for idx, kw in enumerate(self.keywords):
+            for raw in [kw.name, *kw.synonyms]:
+                term = cleaner.clean(raw) if raw else ""
+                if not term:
+                    if raw:
+                        logging.warning(f"Skill term {raw!r} of {kw.name!r} is only symbols and can never match.")
+                    continue
+                self._term_skills.setdefault(term, set()).add(idx)
+
+        self._implied = {term: self._skills_of_prefixes(term) for term in self._term_skills}
+        self.pattern = self._compile()
+
+    def _compile(self):
+        stems = {t for t in self._term_skills if self.suffixes and len(t) >= self.min_stem_length}
+        exact = [t for t in self._term_skills if t not in stems]
+        # Stems first: they are never shorter than an exact term, so "longest first" holds
+        groups = []
+        if stems:
+            suffix = "|".join(re.escape(s) for s in sorted(self.suffixes, key=len, reverse=True))
+            groups.append(f"({self._trie_regex(self._build_trie(stems))})(?:{suffix}){{0,3}}{self._END}")
+        if exact:
+            groups.append(f"({self._trie_regex(self._build_trie(exact))}){self._END}")
+        if not groups:
+            return None
+        return re.compile(rf"{self._START}(?={'|'.join(groups)})")
+
+    # ----------------------- TRIE REGEX ----------------------- #
+    @staticmethod
+    def _build_trie(terms) -> dict:
+        trie: dict = {}
+        for term in terms:
+            node = trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[""] = True
+        return trie
+
+    def _trie_regex(self, node: dict) -> str:
+        """
+        Turns the trie into a prefix-factored regex, so the engine tests one
+        branch per character instead of every term. Optional tails are greedy,
+        which keeps "longest term first" and backtracks for the trailing boundary.
+        """
+        branches = [
+            re.escape(char) + self._trie_regex(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            return f"(?:{body})?"
+        return body
+
+    # ----------------------- PREFIX TABLE ----------------------- #
+    def _skills_of_prefixes(self, term: str) -> frozenset[int]:
+        """Skills of `term` plus every shorter term that is a word-prefix of it."""
+        skills = set(self._term_skills[term])
+        # The end boundary after a prefix only depends on the char after the cut
+        for cut in range(1, len(term)):
+            if not self._is_word(term[cut]):
+                skills |= self._term_skills.get(term[:cut], set())
+        return frozenset(skills)
+
+    def _is_word(self, char: str) -> bool:
+        return self._WORD_CHAR.match(char) is not None
+
+    # ----------------------- MATCH ----------------------- #
+    def match(self, text: str) -> set[int]:
+        """Returns the indexes of all keywords found in an already cleaned text."""
+        found: set[int] = set()
+        if self.pattern is None:
+            return found
+        for m in self.pattern.finditer(text):
+            found |= self._implied[m.group(m.lastindex)]
+        return found
+
+    def match_names(self, text: str) -> set[str]:
+        """Same as match() but returns canonical skill names."""
+        return {self.keywords[i].name for i in self.match(text)}
+
+
+# Only these fields are searched, so nothing else is pulled from the server
+TEXT_FIELDS = ("job_title", "company_name", "summary_description")
+TEXT_PROJECTION = {"_id": 0, **{field: 1 for field in TEXT_FIELDS}}
+# Counting also reads the ingest-time tags, so tagged postings are never re-matched
+COUNT_PROJECTION = {**TEXT_PROJECTION, "skills": 1}
+# Postings tagged as near-duplicates at ingest (see near_dup.py) are not counted again
+ORIGINALS_ONLY = {"near_duplicate_of": None}
+
+
+def _default_taxonomy():
+    from taxonomy import get_taxonomy
+
+    return get_taxonomy()
+
+
+def _refresh_taxonomy(owner):
+    """Picks up the latest keywords and matcher when `owner` follows a taxonomy file."""
+    if owner.taxonomy is not None:
+        owner.keywords, owner.matcher = owner.taxonomy.current()
+
+
+# -------------------------------------------------------
+# 5. Skill Tagger (Ingest Time)
+# -------------------------------------------------------
+class SkillTagger:
+    """
+    Extracts canonical skills and categories from a posting once, when it is
+    saved, so reports can be answered from the stored tags.
+    """
+
+    def __init__(self, keywords: list[SkillKeyword] = None):
+        # Explicit keywords win; otherwise the SKILL_TAXONOMY file, if any (see taxonomy.py)
+        self.taxonomy = None if keywords else _default_taxonomy()
+        self.keywords = list(keywords or DEFAULT_KEYWORDS)
+        self.matcher = SkillMatcher(self.keywords)
+        self.cleaner = MatchCleaner()
+        _refresh_taxonomy(self)
+
+    def tag(self, posting: dict) -> tuple[list[str], list[str]]:
+        """Returns (skills, categories) in keyword order."""
+        _refresh_taxonomy(self)
+        # Same text as Analyzer._combine_text, so tags agree with count_skills
+        text = self.cleaner.clean(" ".join(f"{posting.get(f, '')}" for f in TEXT_FIELDS))
+        found = sorted(self.matcher.match(text))
+        skills = [self.keywords[i].name for i in found]
+        categories = list(dict.fromkeys(self.keywords[i].category for i in found))
+        return skills, categories
+
+    def tag_posting(self, posting: dict) -> dict:
+        """Adds `skills` and `categories` fields to the posting in place."""
+        posting["skills"], posting["categories"] = self.tag(posting)
+        return posting
+
+
 # -------------------------------------------------------
-# 4. Analyzer Class (FULL VERSION)
+# 6. Analyzer Class (FULL VERSION)
 # -------------------------------------------------------
+
 class Analyzer(ISkillAnalyzer):
     """Pulls job postings from MongoDB and performs keyword analysis."""
 
-    def __init__(self, uri="mongodb://localhost:27017", db="jobs", collection="ads"):
-        self.client = MongoClient(uri)
-        self.collection = self.client[db][collection]
-        self.cleaner = SymbolCleaner()
-
-        # Extended keywords
-        self.keywords: list[SkillKeyword] = [
-            SkillKeyword("python", ["python3", "py"], "technical"),
-            SkillKeyword("sql", ["postgres", "mysql"], "technical"),
-            SkillKeyword("javascript", ["js", "node"], "technical"),
-            SkillKeyword("docker", ["containers"], "technical"),
-            SkillKeyword("communication", ["teamwork", "iletişim"], "soft"),
-            SkillKeyword("problem solving", ["critical thinking"], "soft"),
-        ]
+    def __init__(self, uri="mongodb://localhost:27017", db="jobs", collection="ads",
+                 batch_size=1000, state_collection="skill_counts", client=None, cache=None,
+                 use_tags=True):
+        self.uri, self.db_name, self.collection_name = uri, db, collection
+        self.state_collection_name = state_collection
+        # Reuse an existing client (e.g. mongomock in benchmarks); otherwise the
+        # shared pooled one is borrowed on first use, so count_skills_in() never touches MongoDB
+        self._client = client
+        self._owns_client = False
+        self.cleaner = MatchCleaner()
+        self.batch_size = batch_size
+        # Optional ReportCache (see report_cache.py) consulted by count_skills
+        self.cache = cache
+        # Count stored `skills` tags instead of re-matching the text. Tags follow the
+        # keywords of the last ingest or `database.py backfill-skills --force`.
+        self.use_tags = use_tags
+
+        self.keywords: list[SkillKeyword] = list(DEFAULT_KEYWORDS)
+        self.matcher = SkillMatcher(self.keywords)
+        # Set to None before assigning keywords by hand, or the file wins on the next count
+        self.taxonomy = _default_taxonomy()
+        _refresh_taxonomy(self)
+
+    # ----------------------- LAZY CONNECTION ----------------------- #
+    @property
+    def client(self):
+        if self._client is None:
+            import mongo_pool
+
+            self._client = mongo_pool.acquire(self.uri)
+            self._owns_client = True
+        return self._client
+
+    def close(self):
+        """Hands a borrowed pooled client back; a client passed in is the caller's to close."""
+        if self._owns_client:
+            import mongo_pool
+
+            mongo_pool.release(self.uri)
+            self._client, self._owns_client = None, False
+
+    @property
+    def collection(self):
+        return self.client[self.db_name][self.collection_name]
+
+    @property
+    def state_collection(self):
+        """Stored totals + watermark for incremental runs, one document per ads collection."""
+        return self.client[self.db_name][self.state_collection_name]
 
     # ----------------------- TEXT COMBINATION ----------------------- #
     def _combine_text(self, job: dict) -> str:
@@ -84,8 +327,48 @@ class Analyzer(ISkillAnalyzer):
         pattern = rf"\b{re.escape(keyword)}\b"
         return re.search(pattern, text) is not None
 
+    # ----------------------- STREAMING PIPELINE ----------------------- #
+    def _iter_postings(self, query=None):
+        """Projected cursor; documents arrive batch_size at a time."""
+        return self.collection.find(
+            {**ORIGINALS_ONLY, **(query or {})}, COUNT_PROJECTION, batch_size=self.batch_size
+        )
+
+    def _iter_found(self, postings):
+        """Keyword indexes per posting: its stored `skills` tags, else a match on its text."""
+        by_name = {kw.name: i for i, kw in enumerate(self.keywords)}
+        analyzed = matched = 0
+        for job in postings:
+            analyzed += 1
+            skills = job.get("skills") if self.use_tags else None
+            if skills is not None:
+                yield [by_name[name] for name in skills if name in by_name]
+            else:
+                matched += 1
+                yield self.matcher.match(self._combine_text(job))
+        METRICS.inc("postings_analyzed", analyzed)
+        METRICS.inc("postings_matched", matched)
+
+    def _empty_counts(self) -> dict:
+        return self._aggregate([])
+
+    def _aggregate(self, matches) -> dict:
+        results = {k.name: 0 for k in self.keywords}
+        category_results = {"technical": 0, "soft": 0}
+        for kw in self.keywords:
+            category_results.setdefault(kw.category, 0)
+
+        for found in matches:
+            for idx in found:
+                kw = self.keywords[idx]
+                results[kw.name] += 1
+                category_results[kw.category] += 1
+
+        results["category_counts"] = category_results
+        return results
+
     # ----------------------- SKILL COUNT ----------------------- #
-    def count_skills(self) -> dict:
+    def count_skills(self, workers: int = 1) -> dict:
         """
         Returns dictionary:
         {
@@ -93,29 +376,154 @@ class Analyzer(ISkillAnalyzer):
             'sql': 5,
             'category_counts': {'technical': 15, 'soft': 7}
         }
+        With workers > 1 the collection is split into _id ranges that are
+        counted in separate processes; the result is identical. With a cache
+        the scan only runs when the corpus or the keyword list has changed.
         """
-        results = {k.name: 0 for k in self.keywords}
-        category_results = {"technical": 0, "soft": 0}
+        if self.cache is not None:
+            from report_cache import report_key
 
-        postings = self.collection.find()
+            key = report_key("count_skills", self.keywords_fingerprint(), self.corpus_version(),
+                             collection=f"{self.db_name}.{self.collection_name}")
+            return self.cache.cached(key, lambda: self._count_skills(workers))
+        return self._count_skills(workers)
 
-        for job in postings:
-            text = self._combine_text(job)
+    def corpus_version(self) -> str:
+        """Store, document count and newest _id, as MongoDBManager.corpus_version."""
+        latest = self.collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        count = self.collection.estimated_document_count()
+        return f"mongodb:{self.uri}/{self.collection.full_name}:{count}:{latest['_id'] if latest else ''}"
 
-            for kw in self.keywords:
-                matched = False
+    def _count_skills(self, workers: int) -> dict:
+        if workers > 1:
+            with METRICS.timer("analyze"):
+                return self._count_skills_parallel(workers)
+        return self.count_skills_in(self._iter_postings())
 
-                # Main keyword
-                if self._match_keyword(text, kw.name):
-                    matched = True
+    def _id_ranges(self, parts: int) -> list[tuple]:
+        """Splits the collection into roughly equal (lo, hi) _id ranges, hi exclusive."""
+        buckets = self.collection.aggregate([
+            {"$bucketAuto": {"groupBy": "$_id", "buckets": parts}},
+        ])
+        lows = [b["_id"]["min"] for b in buckets]
+        return [(lo, lows[i + 1] if i + 1 < len(lows) else None) for i, lo in enumerate(lows)]
 
-                # Synonyms
-                if any(self._match_keyword(text, syn) for syn in kw.synonyms):
-                    matched = True
+    def _count_skills_parallel(self, workers: int) -> dict:
+        from concurrent.futures import ProcessPoolExecutor
 
-                if matched:
-                    results[kw.name] += 1
-                    category_results[kw.category] += 1
+        _refresh_taxonomy(self)
+        # A few ranges per worker so one slow range does not stall the pool
+        ranges = self._id_ranges(workers * 4)
+        jobs = [
+            (self.uri, self.db_name, self.collection_name, self.batch_size, self.matcher, lo, hi)
+            for lo, hi in ranges
+        ]
+        totals = self._empty_counts()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(_count_range, jobs):
+                self.merge_counts(totals, part)
+        return totals
 
-        results["category_counts"] = category_results
-        return results
\ No newline at end of file
+    def count_skills_in(self, postings) -> dict:
+        """
+        Runs the tags-or-match -> aggregate generator chain over any iterable
+        of posting dicts. Postings tagged at ingest are counted from their
+        `skills`; only untagged ones are cleaned and matched. Only one posting
+        is held in memory at a time.
+        """
+        _refresh_taxonomy(self)
+        with METRICS.timer("analyze"):
+            return self._aggregate(self._iter_found(postings))
+
+    def count_skills_file(self, path: str) -> dict:
+        """Counts straight from a columnar export (see columnar.py), without MongoDB."""
+        from columnar import iter_file_postings
+
+        projection = {**COUNT_PROJECTION, "near_duplicate_of": 1}
+        originals = (p for p in iter_file_postings(path, projection, self.batch_size)
+                     if not p.get("near_duplicate_of"))
+        return self.count_skills_in(originals)
+
+    # ----------------------- INCREMENTAL COUNT ----------------------- #
+    def keywords_fingerprint(self) -> str:
+        """Stable hash of the keyword list and match settings; a change forces a full rebuild."""
+        _refresh_taxonomy(self)
+        payload = json.dumps(
+            [[kw.name, list(kw.synonyms), kw.category] for kw in self.keywords]
+            + [list(self.matcher.suffixes), self.matcher.min_stem_length, "MatchCleaner"],
+            ensure_ascii=False,
+        )
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def merge_counts(total: dict, part: dict) -> dict:
+        """Adds the counts of `part` into `total` (both in count_skills format)."""
+        for name, value in part.items():
+            if name == "category_counts":
+                categories = total.setdefault("category_counts", {})
+                for category, count in value.items():
+                    categories[category] = categories.get(category, 0) + count
+            else:
+                total[name] = total.get(name, 0) + value
+        return total
+
+    def count_skills_incremental(self, rebuild: bool = False) -> dict:
+        """
+        Only scans postings with an _id above the stored watermark and merges
+        them into the stored totals. Falls back to a full scan on the first
+        run, when `rebuild` is set, or when the keyword list has changed.
+        """
+        state_id = self.collection.name
+        fingerprint = self.keywords_fingerprint()
+        state = self.state_collection.find_one({"_id": state_id})
+
+        if rebuild or state is None or state.get("keywords_hash") != fingerprint:
+            logging.info("Rebuilding skill counts from scratch.")
+            totals, watermark = self._empty_counts(), None
+        else:
+            totals, watermark = state["counts"], state.get("watermark")
+
+        query = {"_id": {"$gt": watermark}} if watermark is not None else {}
+        query.update(ORIGINALS_ONLY)
+        cursor = self.collection.find(
+            query, {**COUNT_PROJECTION, "_id": 1}, batch_size=self.batch_size
+        ).sort("_id", 1)
+
+        seen = {"last_id": watermark, "count": 0}
+
+        def track(postings):
+            for job in postings:
+                seen["last_id"] = job["_id"]
+                seen["count"] += 1
+                yield job
+
+        new_counts = self.count_skills_in(track(cursor))
+        totals = self.merge_counts(totals, new_counts)
+
+        self.state_collection.replace_one(
+            {"_id": state_id},
+            {"counts": totals, "watermark": seen["last_id"], "keywords_hash": fingerprint},
+            upsert=True,
+        )
+        logging.info(f"Incremental analysis processed {seen['count']} new postings.")
+        return totals
+
+
+# -------------------------------------------------------
+# 7. Process Pool Worker
+# -------------------------------------------------------
+def _count_range(job: tuple) -> dict:
+    """
+    Runs in a worker process: borrows that process's pooled client, recompiles
+    the parent's matcher and counts the postings of one _id range.
+    """
+    uri, db, collection, batch_size, matcher, lo, hi = job
+    analyzer = Analyzer(uri, db, collection, batch_size=batch_size)
+    analyzer.taxonomy = None
+    analyzer.keywords, analyzer.matcher = matcher.keywords, matcher
+
+    id_range = {"$gte": lo}
+    if hi is not None:
+        id_range["$lt"] = hi
+    # The pooled client stays open for the next range this worker picks up
+    return analyzer.count_skills_in(analyzer._iter_postings({"_id": id_range}))
\ No newline at end of file
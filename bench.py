@@ -0,0 +1,455 @@
+"""
+Benchmarks for the hot paths of the project.
+
+Run with:  python bench.py                      (stage suite, writes bench_results.json)
+           python bench.py suite --sizes 1000 100000 --compare old.json
+           python bench.py micro                (old-vs-new comparison tables)
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from analysis import TEXT_PROJECTION, Analyzer, SkillKeyword, SkillMatcher, SymbolCleaner
+from database import (
+    BACKENDS, FULL_CLEANING, EmojiCleaner, HTMLCleaner, MongoDBManager, StopwordCleaner,
+    get_database,
+)
+from corpus import make_corpus
+from dedup import LinkIndex
+
+# -------------------------------------------------------
+# 1. Synthetic Data
+# -------------------------------------------------------
+BASE_KEYWORDS = [
+    SkillKeyword("python", ["python3", "py"], "technical"),
+    SkillKeyword("sql", ["postgres", "mysql"], "technical"),
+    SkillKeyword("javascript", ["js", "node"], "technical"),
+    SkillKeyword("docker", ["containers"], "technical"),
+    SkillKeyword("communication", ["teamwork", "iletişim"], "soft"),
+    SkillKeyword("problem solving", ["critical thinking"], "soft"),
+]
+
+FILLER_WORDS = [
+    "developer", "experience", "team", "backend", "frontend", "ilan",
+    "deneyim", "yazılım", "proje", "web", "remote", "istanbul", "senior",
+]
+
+
+def make_keywords(n: int) -> list[SkillKeyword]:
+    """Returns the 6 real keywords padded with synthetic ones up to n."""
+    keywords = list(BASE_KEYWORDS[:n])
+    for i in range(len(keywords), n):
+        category = "technical" if i % 3 else "soft"
+        keywords.append(SkillKeyword(f"skill{i}", [f"skill{i}x", f"tool {i}"], category))
+    return keywords
+
+
+def make_texts(keywords: list[SkillKeyword], count: int, seed: int = 42) -> list[str]:
+    """Cleaned posting texts that mention a few random skills each."""
+    rng = random.Random(seed)
+    cleaner = SymbolCleaner()
+    terms = [t for kw in keywords for t in [kw.name, *kw.synonyms]]
+    texts = []
+    for _ in range(count):
+        words = rng.choices(FILLER_WORDS, k=60) + rng.choices(terms, k=4)
+        rng.shuffle(words)
+        texts.append(cleaner.clean(" ".join(words)))
+    return texts
+
+
+# -------------------------------------------------------
+# 2. Skill Matching Benchmark
+# -------------------------------------------------------
+def _naive_match(analyzer: Analyzer, keywords: list[SkillKeyword], text: str) -> set[int]:
+    """The original per-keyword, per-synonym re.search loop."""
+    return {
+        idx for idx, kw in enumerate(keywords)
+        if analyzer._match_keyword(text, kw.name)
+        or any(analyzer._match_keyword(text, syn) for syn in kw.synonyms)
+    }
+
+
+def bench_skill_matching(sizes=(6, 50, 200, 1000), postings: int = 500):
+    """Compares the naive loop with the compiled SkillMatcher."""
+    analyzer = Analyzer.__new__(Analyzer)  # no DB connection needed
+
+    print(f"{'keywords':>8} {'naive docs/s':>14} {'compiled docs/s':>16} {'speedup':>8}")
+    for size in sizes:
+        keywords = make_keywords(size)
+        texts = make_texts(keywords, postings)
+
+        start = time.perf_counter()
+        naive = [_naive_match(analyzer, keywords, t) for t in texts]
+        naive_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        matcher = SkillMatcher(keywords)
+        compiled = [matcher.match(t) for t in texts]
+        compiled_time = time.perf_counter() - start
+
+        assert naive == compiled, "compiled matcher disagrees with the naive loop"
+        print(
+            f"{size:>8} {postings / naive_time:>14.0f} "
+            f"{postings / compiled_time:>16.0f} {naive_time / compiled_time:>7.1f}x"
+        )
+
+
+# -------------------------------------------------------
+# 3. Cleaning Benchmark
+# -------------------------------------------------------
+def _chained_clean(posting: dict) -> dict:
+    """
+    The original main.py save path: a cleaning subclass ran HTML -> emoji ->
+    stopword on every field, then MongoDBManager cleaned the result again.
+    """
+    html, emoji, stop = HTMLCleaner(), EmojiCleaner(), StopwordCleaner()
+    p = dict(posting)
+    for field in ("job_title", "company_name", "summary_description"):
+        p[field] = stop.clean(emoji.clean(html.clean(p.get(field, ""))))
+    p["job_title"] = stop.clean(html.clean(p["job_title"]))
+    p["company_name"] = html.clean(p["company_name"])
+    p["summary_description"] = emoji.clean(p["summary_description"])
+    return p
+
+
+def bench_cleaning(count: int = 20000):
+    """Old chained cleaners vs the fused CleaningPipeline (equal output: tests/test_cleaning.py)."""
+    postings = make_corpus(count)
+
+    start = time.perf_counter()
+    for p in postings:
+        _chained_clean(p)
+    chained_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    FULL_CLEANING.clean_batch(postings)
+    fused_time = time.perf_counter() - start
+
+    print(f"{'postings':>8} {'chained docs/s':>15} {'fused docs/s':>13} {'speedup':>8}")
+    print(f"{count:>8} {count / chained_time:>15.0f} {count / fused_time:>13.0f} "
+          f"{chained_time / fused_time:>7.1f}x")
+
+
+# -------------------------------------------------------
+# 4. Ingest Benchmark
+# -------------------------------------------------------
+def _bench_client():
+    """A local mongod if one answers, otherwise an in-process mongomock."""
+    try:
+        from pymongo import MongoClient
+        client = MongoClient("mongodb://localhost:27017", serverSelectionTimeoutMS=500)
+        client.server_info()
+        return client, "mongod"
+    except Exception:
+        import mongomock
+        return mongomock.MongoClient(), "mongomock"
+
+
+def bench_ingest(sizes=(1000, 10000), chunk_size=1000):
+    """Per-document save_postings vs the chunked bulk upsert path."""
+    client, backend = _bench_client()
+    logging.getLogger().setLevel(logging.WARNING)  # silence per-duplicate logs
+
+    print(f"ingest backend: {backend}")
+    print(f"{'postings':>8} {'per-doc docs/s':>15} {'bulk docs/s':>12} {'speedup':>8}")
+    for size in sizes:
+        postings = make_corpus(size)
+        timings = {}
+        for bulk in (False, True):
+            client.drop_database("bench_jobs")
+            manager = MongoDBManager(db="bench_jobs", collection="ads", client=client,
+                                     bulk=bulk, chunk_size=chunk_size)
+            start = time.perf_counter()
+            inserted = manager.save_postings([dict(p) for p in postings])
+            timings[bulk] = (time.perf_counter() - start, len(inserted))
+
+        assert timings[False][1] == timings[True][1], "bulk path inserted a different count"
+        per_doc, bulk_time = timings[False][0], timings[True][0]
+        print(f"{size:>8} {size / per_doc:>15.0f} {size / bulk_time:>12.0f} {per_doc / bulk_time:>7.1f}x")
+    client.drop_database("bench_jobs")
+
+
+# -------------------------------------------------------
+# 5. Parallel Analysis Benchmark
+# -------------------------------------------------------
+def bench_parallel_analysis(postings: int = 200000, worker_counts=(1, 2, 4, 8)):
+    """count_skills scaling over worker processes. Needs a real mongod."""
+    client, backend = _bench_client()
+    if backend != "mongod":
+        print("parallel analysis benchmark skipped: worker processes need a real mongod")
+        return
+
+    collection = client["bench_jobs"]["analysis"]
+    collection.drop()
+    texts = make_texts(BASE_KEYWORDS, postings)
+    for start in range(0, postings, 10000):
+        collection.insert_many(
+            [{"job_title": "", "company_name": "", "summary_description": t}
+             for t in texts[start:start + 10000]]
+        )
+
+    analyzer = Analyzer(db="bench_jobs", collection="analysis")
+    expected = analyzer.count_skills()
+    print(f"{'workers':>8} {'docs/s':>10} {'speedup':>8}")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        result = analyzer.count_skills(workers=workers)
+        elapsed = time.perf_counter() - start
+        assert result == expected, "parallel result differs from the serial path"
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {postings / elapsed:>10.0f} {baseline / elapsed:>7.1f}x")
+    client.drop_database("bench_jobs")
+
+
+# -------------------------------------------------------
+# 6. Backend Benchmark
+# -------------------------------------------------------
+def _open_backend(name: str, client, workdir: str):
+    if name == "mongodb":
+        client.drop_database("bench_jobs")
+        return get_database(name, db="bench_jobs", collection="ads", client=client)
+    if name == "sqlite":
+        return get_database(name, path=os.path.join(workdir, "bench.db"))
+    return get_database(name)
+
+
+def bench_backends(count: int = 20000):
+    """The same ingest + analysis run against every registered backend."""
+    client, mongo_backend = _bench_client()
+    logging.getLogger().setLevel(logging.WARNING)
+    analyzer = Analyzer(db="bench_jobs", client=client)
+    postings = make_corpus(count)
+
+    print(f"{'backend':>10} {'ingest docs/s':>14} {'analyze docs/s':>15}")
+    expected = None
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in BACKENDS:
+            db = _open_backend(name, client, workdir)
+
+            start = time.perf_counter()
+            stored = len(db.save_postings([dict(p) for p in postings]))
+            ingest_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            counts = analyzer.count_skills_in(db.iter_postings(TEXT_PROJECTION))
+            analyze_time = time.perf_counter() - start
+
+            expected = expected or counts
+            assert counts == expected, f"{name} analysis differs from the other backends"
+            label = f"{name} ({mongo_backend})" if name == "mongodb" else name
+            print(f"{label:>10} {count / ingest_time:>14.0f} {stored / analyze_time:>15.0f}")
+            db.close()
+    client.drop_database("bench_jobs")
+
+
+# -------------------------------------------------------
+# 7. Stage Suite (machine-readable)
+# -------------------------------------------------------
+STAGES = ("clean", "dedup", "insert", "count", "startup")
+SUITE_BACKENDS = ("memory", "sqlite", "mongodb")
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+STARTUP_COMMANDS = (["--help"], ["analyze", "--help"], ["report", "--help"], ["crawl", "--help"])
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _timed(func, repeat: int):
+    """Best wall time of `repeat` runs of func() and the result of the last one."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _record(results: list, stage: str, backend: str, size: int, seconds: float, items: int):
+    results.append({
+        "stage": stage,
+        "backend": backend,
+        "size": size,
+        "items": items,
+        "seconds": round(seconds, 6),
+        "docs_per_sec": round(size / seconds, 1) if seconds else None,
+    })
+    print(f"{stage:>7} {backend:>20} {size:>9} {seconds:>10.3f}s {size / seconds:>12.0f} docs/s")
+
+
+def measure_startup(args: list[str], repeat: int = 5) -> float:
+    """Best wall time of a fresh `python main.py <args>` process."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True, check=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench_startup(repeat: int = 5) -> list[dict]:
+    """CLI start-up per subcommand, next to a bare interpreter for reference."""
+    interpreter = measure_startup(["-c", "pass"], repeat)
+    print(f"{'command':>24} {'seconds':>9} {'over python':>12}")
+    print(f"{'python -c pass':>24} {interpreter:>9.3f} {'':>12}")
+    results = []
+    for command in STARTUP_COMMANDS:
+        seconds = measure_startup([MAIN_SCRIPT, *command], repeat)
+        label = "main.py " + " ".join(command)
+        print(f"{label:>24} {seconds:>9.3f} {seconds - interpreter:>11.3f}s")
+        results.append({"stage": "startup", "backend": label, "size": 0, "items": 0,
+                        "seconds": round(seconds, 6), "docs_per_sec": None})
+    return results
+
+
+def run_suite(sizes=(1000, 10000), backends=SUITE_BACKENDS, stages=STAGES,
+              repeat: int = 1, seed: int = 42) -> list[dict]:
+    """
+    Times every stage of the ingest/analysis path on the same synthetic
+    corpus. Insert and count run once per backend on a fresh store; the
+    mongodb backend uses a local mongod when available, else mongomock
+    (whose upserts scan the collection, so keep it to the smaller sizes).
+    """
+    client, mongo_backend = _bench_client()
+    logging.getLogger().setLevel(logging.WARNING)
+    analyzer = Analyzer(db="bench_jobs", client=client)
+    results = bench_startup(max(repeat, 3)) if "startup" in stages else []
+
+    print(f"{'stage':>7} {'backend':>20} {'size':>9} {'time':>11} {'throughput':>19}")
+    for size in sizes:
+        postings = make_corpus(size, seed)
+        links = [p["ad_link"] for p in postings]
+
+        if "clean" in stages:
+            seconds, _ = _timed(lambda: FULL_CLEANING.clean_batch(postings), repeat)
+            _record(results, "clean", "pipeline", size, seconds, size)
+
+        if "dedup" in stages:
+            # Half the links are already known, like a re-crawl
+            for bloom in (False, True):
+                index = LinkIndex(bloom=bloom, capacity=size).load(links[: size // 2])
+                seconds, new = _timed(lambda: index.filter_new(links), repeat)
+                _record(results, "dedup", "bloom" if bloom else "exact", size, seconds, len(new))
+
+        if not {"insert", "count"} & set(stages):
+            continue
+        with tempfile.TemporaryDirectory() as workdir:
+            for name in backends:
+                label = f"{name} ({mongo_backend})" if name == "mongodb" else name
+                db = _open_backend(name, client, workdir)
+                # Inserting is not repeatable on one store, so it always runs once
+                seconds, stored = _timed(lambda: db.save_postings([dict(p) for p in postings]), 1)
+                if "insert" in stages:
+                    _record(results, "insert", label, size, seconds, len(stored))
+                if "count" in stages:
+                    seconds, counts = _timed(
+                        lambda: analyzer.count_skills_in(db.iter_postings(TEXT_PROJECTION)), repeat
+                    )
+                    _record(results, "count", label, size, seconds, sum(
+                        v for k, v in counts.items() if k != "category_counts"
+                    ))
+                db.close()
+    client.drop_database("bench_jobs")
+    return results
+
+
+def write_results(results: list[dict], path: str, seed: int):
+    payload = {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    print(f"Results written to {path}")
+
+
+def compare_results(baseline_path: str, results: list[dict], tolerance: float = 0.10) -> int:
+    """
+    Prints the throughput change of every stage against a previous results
+    file and returns how many got slower by more than `tolerance`.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+    previous = {(r["stage"], r["backend"], r["size"]): r for r in baseline["results"]}
+
+    def speed(r):
+        # Throughput where there is one (start-up has none: faster = fewer seconds)
+        return r["docs_per_sec"] or (1 / r["seconds"] if r["seconds"] else None)
+
+    print(f"\ncompared with {baseline.get('commit', '?')} ({baseline_path})")
+    regressions = 0
+    for r in results:
+        old = previous.get((r["stage"], r["backend"], r["size"]))
+        if not old or not speed(old) or not speed(r):
+            continue
+        change = speed(r) / speed(old) - 1
+        flag = ""
+        if change < -tolerance:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{r['stage']:>7} {r['backend']:>20} {r['size']:>9} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def run_micro():
+    bench_skill_matching()
+    bench_cleaning()
+    bench_ingest()
+    bench_parallel_analysis()
+    bench_backends()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the ingest and analysis paths.")
+    sub = parser.add_subparsers(dest="command")
+    suite = sub.add_parser("suite", help="per-stage timings written as JSON (default)")
+    suite.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    suite.add_argument("--backends", nargs="+", default=list(SUITE_BACKENDS), choices=list(BACKENDS))
+    suite.add_argument("--stages", nargs="+", default=list(STAGES), choices=STAGES)
+    suite.add_argument("--repeat", type=int, default=1)
+    suite.add_argument("--seed", type=int, default=42)
+    suite.add_argument("--output", default="bench_results.json")
+    suite.add_argument("--compare", metavar="BASELINE_JSON")
+    suite.add_argument("--tolerance", type=float, default=0.10)
+    sub.add_parser("micro", help="old-vs-new comparisons printed as tables")
+    sub.add_parser("startup", help="CLI start-up time per subcommand")
+    args = parser.parse_args(argv)
+
+    if args.command == "micro":
+        run_micro()
+        return 0
+    if args.command == "startup":
+        bench_startup()
+        return 0
+    if args.command is None:
+        args = suite.parse_args([])
+
+    results = run_suite(args.sizes, args.backends, args.stages, args.repeat, args.seed)
+    write_results(results, args.output, args.seed)
+    if args.compare:
+        return 1 if compare_results(args.compare, results, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Compact columnar export/import of the postings corpus.
+
+Postings are streamed out of any backend in chunks and written as record
+batches to a compressed Arrow IPC file (.arrow, zstd) or a Parquet file
+(.parquet). Reading goes the other way one batch at a time: Arrow files are
+memory-mapped, so only the columns that are asked for are ever touched.
+The analysis engine can run straight on such a file, see Analyzer.count_skills_file.
+
+pyarrow is only needed here and is imported on first use.
+"""
+import logging
+from datetime import datetime, timezone
+
+from metrics import METRICS
+
+CHUNK_SIZE = 10000
+COMPRESSION = "zstd"
+
+STRING_COLUMNS = ("job_title", "company_name", "summary_description", "ad_link", "near_duplicate_of")
+LIST_COLUMNS = ("skills", "categories")
+COLUMNS = STRING_COLUMNS[:4] + LIST_COLUMNS + ("first_seen", "near_duplicate_of")
+
+
+def _schema():
+    import pyarrow as pa
+
+    types = {name: pa.string() for name in STRING_COLUMNS}
+    types.update({name: pa.list_(pa.string()) for name in LIST_COLUMNS})
+    types["first_seen"] = pa.timestamp("us", tz="UTC")
+    return pa.schema([(name, types[name]) for name in COLUMNS])
+
+
+def _is_parquet(path: str) -> bool:
+    return str(path).endswith((".parquet", ".pq"))
+
+
+def _columns(projection) -> list[str]:
+    """Mongo-style {field: 1} projection -> the file columns to read."""
+    if not projection:
+        return list(COLUMNS)
+    wanted = [name for name in COLUMNS if projection.get(name)]
+    return wanted or list(COLUMNS)
+
+
+def _first_seen(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime) and value.tzinfo is None:
+        # MongoDB hands back naive UTC datetimes
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+
+# -------------------------------------------------------
+# 1. Export
+# -------------------------------------------------------
+def _chunks(postings, size: int):
+    chunk = []
+    for posting in postings:
+        chunk.append(posting)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _record_batch(chunk: list[dict], schema):
+    import pyarrow as pa
+
+    data = {name: [p.get(name) for p in chunk] for name in COLUMNS}
+    data["first_seen"] = [_first_seen(v) for v in data["first_seen"]]
+    return pa.RecordBatch.from_pydict(data, schema=schema)
+
+
+def export_postings(db, path: str, chunk_size: int = CHUNK_SIZE, compression: str = COMPRESSION) -> int:
+    """Streams every posting of `db` into `path` and returns how many were written."""
+    import pyarrow as pa
+
+    schema = _schema()
+    projection = {"_id": 0, **{name: 1 for name in COLUMNS}}
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(path, schema, compression=compression)
+    else:
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+        writer = pa.ipc.new_file(path, schema, options=options)
+
+    written = 0
+    try:
+        with METRICS.timer("export"):
+            for chunk in _chunks(db.iter_postings(projection, batch_size=chunk_size), chunk_size):
+                writer.write_batch(_record_batch(chunk, schema))
+                written += len(chunk)
+    finally:
+        writer.close()
+    METRICS.inc("postings_exported", written)
+    logging.info(f"Exported {written} postings to {path}.")
+    return written
+
+
+# -------------------------------------------------------
+# 2. Read
+# -------------------------------------------------------
+def iter_batches(path: str, columns=None, batch_size: int = CHUNK_SIZE):
+    """Yields pyarrow RecordBatches of `columns`; Arrow files are memory-mapped."""
+    import pyarrow as pa
+
+    columns = list(columns or COLUMNS)
+    if _is_parquet(path):
+        import pyarrow.parquet as pq
+        yield from pq.ParquetFile(path, memory_map=True).iter_batches(batch_size, columns=columns)
+        return
+
+    with pa.memory_map(str(path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).select(columns)
+
+
+def iter_file_postings(path: str, projection=None, batch_size: int = CHUNK_SIZE):
+    """Streams postings from a columnar file as dicts, like IDatabase.iter_postings."""
+    for batch in iter_batches(path, _columns(projection), batch_size):
+        yield from batch.to_pylist()
+
+
+# -------------------------------------------------------
+# 3. Import
+# -------------------------------------------------------
+def import_postings(db, path: str, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Loads a columnar file through db.save_postings, so cleaning, dedup and
+    tagging apply as for any ingest; first_seen and near_duplicate_of are
+    kept on every backend. Returns how many were new.
+    """
+    inserted = 0
+    with METRICS.timer("import"):
+        for chunk in _chunks(iter_file_postings(path, batch_size=chunk_size), chunk_size):
+            inserted += len(db.save_postings(chunk))
+    logging.info(f"Imported {inserted} new postings from {path}.")
+    return inserted
@@ -0,0 +1,90 @@
+"""
+Deterministic synthetic job-posting corpus for benchmarks.
+
+Postings look like what KariyerSpider collects: Turkish and English text,
+leftover HTML tags and entities, emoji, skill mentions (with Turkish
+suffixes such as "Python'da") and a share of repeated ad links. The same
+seed always produces the same corpus, so results are comparable across
+commits. generate_postings streams, so any size fits in memory;
+make_corpus materialises a list for the benchmarks.
+
+Run with:  python corpus.py 10000 > corpus.jsonl
+"""
+import json
+import random
+import sys
+
+# -------------------------------------------------------
+# 1. Vocabulary
+# -------------------------------------------------------
+TITLES = {
+    "tr": ["Yazılım Geliştirici", "Kıdemli Python Geliştirici", "Veri Mühendisi",
+           "Backend Uzmanı", "Stajyer Yazılım Mühendisi", "DevOps Mühendisi"],
+    "en": ["Software Developer", "Senior Python Developer", "Data Engineer",
+           "Backend Specialist", "Junior Software Engineer", "DevOps Engineer"],
+}
+COMPANIES = [
+    "Tech Corp &amp; Co.", "Innovation Labs", "Digital Solutions A.Ş.", "Anadolu Yazılım",
+    "Boğaziçi Teknoloji", "İstanbul Data", "Kariyer Danışmanlık", "Global Systems Ltd.",
+]
+SENTENCES = {
+    "tr": ["Ekibimize katılacak {skill} bilgisi olan çalışma arkadaşı arıyoruz.",
+           "{skill}'da en az 3 yıl deneyim tercih sebebidir.",
+           "Güçlü {skill} ve takım çalışması becerisi beklenmektedir.",
+           "Hibrit çalışma modeli, İstanbul ofisi.",
+           "Özel sağlık sigortası ve yemek kartı sunuyoruz."],
+    "en": ["We are looking for an engineer with {skill} experience.",
+           "Strong {skill} skills are required for this role.",
+           "You will work with the team on {skill} projects.",
+           "Remote friendly, flexible hours.",
+           "Competitive salary and private health insurance."],
+}
+SKILL_MENTIONS = [
+    "Python", "python3", "SQL", "PostgreSQL", "MySQL", "JavaScript", "Node", "JS",
+    "Docker", "containers", "communication", "teamwork", "iletişim",
+    "problem solving", "critical thinking", "Java", "React", "Spring",
+]
+DECORATIONS = ["<p>{}</p>", "<b>{}</b>", "{} 🔥", "🚀 {}", "{} &amp; more", "{}"]
+
+
+# -------------------------------------------------------
+# 2. Generator
+# -------------------------------------------------------
+def generate_postings(count: int, seed: int = 42, duplicate_rate: float = 0.2,
+                      turkish_share: float = 0.5):
+    """
+    Yields `count` raw posting dicts. About `duplicate_rate` of them reuse
+    the ad_link of an earlier posting, like a re-crawl would.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        lang = "tr" if rng.random() < turkish_share else "en"
+        if i and rng.random() < duplicate_rate:
+            link_id = rng.randrange(i)
+        else:
+            link_id = i
+        sentences = [
+            rng.choice(SENTENCES[lang]).format(skill=rng.choice(SKILL_MENTIONS))
+            for _ in range(rng.randint(3, 8))
+        ]
+        yield {
+            "job_title": rng.choice(DECORATIONS).format(rng.choice(TITLES[lang])),
+            "company_name": rng.choice(COMPANIES),
+            "summary_description": rng.choice(DECORATIONS).format(" ".join(sentences)),
+            "ad_link": f"https://www.kariyer.net/is-ilani/{link_id}",
+        }
+
+
+def make_corpus(count: int, seed: int = 42, **kwargs) -> list[dict]:
+    """
+    The same postings as a list, for benchmarks that replay one corpus
+    several times. This holds all of it in memory; stream large sizes
+    (e.g. 1M) with generate_postings instead.
+    """
+    return list(generate_postings(count, seed, **kwargs))
+
+
+if __name__ == "__main__":
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    for posting in generate_postings(size):
+        print(json.dumps(posting, ensure_ascii=False))
@@ -0,0 +1,230 @@
+"""
+Concurrent crawl runtime around KariyerSpider.
+
+Scrapy already downloads asynchronously on a pooled, keep-alive HTTP/1.1
+connection pool; this module configures the limits, wires parsed items
+into the pipelined database writer (ingest.py) and reports throughput.
+
+Run with:  python crawler.py [start_url]
+"""
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import functools
+import importlib.util
+import logging
+import os
+import sys
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from metrics import METRICS, profiled, report
+
+# Load environment variables from .env file
+load_dotenv()
+
+# -------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", "16"))
+CRAWL_HOST_CONCURRENCY = int(os.getenv("CRAWL_HOST_CONCURRENCY", "8"))
+CRAWL_HOST_RPS = float(os.getenv("CRAWL_HOST_RPS", "4"))
+CRAWL_JOBDIR = os.getenv("CRAWL_JOBDIR", "")
+CRAWL_BATCH_SIZE = int(os.getenv("CRAWL_BATCH_SIZE", "100"))
+CRAWL_FLUSH_SECONDS = float(os.getenv("CRAWL_FLUSH_SECONDS", "2"))
+CRAWL_HTTPCACHE_DIR = os.getenv("CRAWL_HTTPCACHE_DIR", "")
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# -------------------------------------------------------
+# 1. Spider Loading
+# -------------------------------------------------------
+def _load_module(name: str, filename: str):
+    """Imports a project file whose name is not a valid module name."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(PROJECT_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_spider():
+    """Returns the KariyerSpider class (the spider imports `items`)."""
+    _load_module("items", "1.items.py")
+    return _load_module("datamodeling", "2.datamodeling.py").KariyerSpider
+
+
+# -------------------------------------------------------
+# 2. Item Pipeline: Stream Into The Database
+# -------------------------------------------------------
+class DatabaseWriterPipeline:
+    """
+    Feeds items into an IngestPipeline (see ingest.py), whose own threads
+    clean and save them in micro-batches while the crawl goes on. When its
+    queue is full the item waits in a thread pool, and Scrapy's limit on
+    in-flight items (CONCURRENT_ITEMS) then holds back new downloads.
+    """
+
+    def __init__(self, batch_size: int, flush_seconds: float):
+        self.db = None
+        self.ingest = None
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.settings.getint("DB_BATCH_SIZE"),
+                   crawler.settings.getfloat("DB_FLUSH_SECONDS"))
+
+    def open_spider(self, spider):
+        from ingest import IngestPipeline
+
+        # The writer travels as a spider argument (settings get deep-copied)
+        self.db = getattr(spider, "db", None)
+        if self.db is None:
+            from database import MongoDBManager
+            self.db = MongoDBManager()
+        self.ingest = IngestPipeline(self.db, self.batch_size, self.flush_seconds)
+
+    def process_item(self, item, spider):
+        METRICS.inc("items_scraped")
+        posting = dict(item)
+        if self.ingest.try_submit(posting):
+            return item
+        # Database is behind: wait off the reactor thread (backpressure)
+        from twisted.internet.threads import deferToThread
+
+        METRICS.inc("ingest_backpressure_waits")
+        return deferToThread(self.ingest.submit, posting).addCallback(lambda _: item)
+
+    def close_spider(self, spider):
+        from twisted.internet.threads import deferToThread
+
+        # Drains the in-flight batches without blocking the reactor
+        return deferToThread(self._close)
+
+    def _close(self):
+        with METRICS.timer("crawl_flush"):
+            self.ingest.close()
+        logging.info(f"[CRAWLER] {self.ingest.inserted} new ads written to the database.")
+
+
+# -------------------------------------------------------
+# 3. Extension: Throughput Report
+# -------------------------------------------------------
+class ThroughputStats:
+    """Logs pages/s and items/s when the crawl ends and keeps them in the stats."""
+
+    def __init__(self, stats):
+        self.stats = stats
+        self.started = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        from scrapy import signals
+
+        ext = cls(crawler.stats)
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        self.started = time.perf_counter()
+
+    def spider_closed(self, spider):
+        elapsed = max(time.perf_counter() - self.started, 1e-9)
+        pages = self.stats.get_value("response_received_count", 0)
+        items = self.stats.get_value("item_scraped_count", 0)
+        self.stats.set_value("throughput/pages_per_second", pages / elapsed)
+        self.stats.set_value("throughput/items_per_second", items / elapsed)
+        METRICS.inc("pages_downloaded", pages)
+        METRICS.observe("stage_seconds", elapsed, stage="crawl")
+        logging.info(
+            f"[CRAWLER] {pages} pages, {items} items in {elapsed:.1f}s "
+            f"({pages / elapsed:.1f} pages/s, {items / elapsed:.1f} items/s)"
+        )
+
+
+# -------------------------------------------------------
+# 4. Settings
+# -------------------------------------------------------
+def crawl_settings(**overrides) -> dict:
+    """
+    Scrapy settings for a bounded crawl. DOWNLOAD_DELAY is applied per
+    download slot, i.e. per host, which caps requests per second per host.
+    JOBDIR persists the request queue, so an interrupted crawl resumes
+    from its saved frontier.
+
+    With CRAWL_HTTPCACHE_DIR set, responses are cached on disk per URL and
+    the RFC 2616 policy revalidates them with If-None-Match /
+    If-Modified-Since, so unchanged pages come back as a cheap 304.
+    """
+    settings = {
+        "CONCURRENT_REQUESTS": CRAWL_CONCURRENCY,
+        "CONCURRENT_REQUESTS_PER_DOMAIN": CRAWL_HOST_CONCURRENCY,
+        "DOWNLOAD_DELAY": 1.0 / CRAWL_HOST_RPS if CRAWL_HOST_RPS > 0 else 0,
+        "RANDOMIZE_DOWNLOAD_DELAY": False,
+        "ITEM_PIPELINES": {f"{__name__}.DatabaseWriterPipeline": 300},
+        "EXTENSIONS": {f"{__name__}.ThroughputStats": 500},
+        "DB_BATCH_SIZE": CRAWL_BATCH_SIZE,
+        "DB_FLUSH_SECONDS": CRAWL_FLUSH_SECONDS,
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "INFO"),
+    }
+    if CRAWL_JOBDIR:
+        settings["JOBDIR"] = CRAWL_JOBDIR
+    if CRAWL_HTTPCACHE_DIR:
+        settings.update({
+            "HTTPCACHE_ENABLED": True,
+            "HTTPCACHE_DIR": CRAWL_HTTPCACHE_DIR,
+            "HTTPCACHE_POLICY": "scrapy.extensions.httpcache.RFC2616Policy",
+            "HTTPCACHE_STORAGE": "scrapy.extensions.httpcache.FilesystemCacheStorage",
+        })
+    settings.update(overrides)
+    return settings
+
+
+def load_known_links(db) -> set:
+    """Reads every stored ad_link once, so the spider can skip known ads locally."""
+    links = {p.get("ad_link") for p in db.iter_postings({"_id": 0, "ad_link": 1})}
+    links.discard(None)
+    logging.info(f"[CRAWLER] {len(links)} known ad links loaded.")
+    return links
+
+
+def run_crawl(start_url=None, db=None, **overrides) -> dict:
+    """Runs KariyerSpider to completion and returns the final crawl stats."""
+    from scrapy.crawler import CrawlerProcess
+
+    if db is None:
+        from database import MongoDBManager
+        db = MongoDBManager()
+
+    process = CrawlerProcess(settings=crawl_settings(**overrides))
+    crawler = process.create_crawler(load_spider())
+    process.crawl(crawler, start_url=start_url, db=db, known_links=load_known_links(db))
+    process.start()
+    return crawler.stats.get_stats()
+
+
+# -------------------------------------------------------
+# 5. Local Replay Server
+# -------------------------------------------------------
+def serve_directory(directory: str, port: int = 0) -> ThreadingHTTPServer:
+    """
+    Serves recorded listing pages from `directory` on localhost in a
+    background thread, so the crawler can be tested without kariyer.net.
+    Returns the server; its URL is http://127.0.0.1:<server.server_port>/.
+    """
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    with profiled():
+        run_crawl(sys.argv[1] if len(sys.argv) > 1 else None)
+    report()
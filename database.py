@@ -1,11 +1,18 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from datetime import datetime
 from abc import ABC, abstractmethod
-from pymongo import MongoClient, errors
+from collections import Counter
+import json
 import re
 import logging
-import time
+import sqlite3
 import os
+import uuid
 from dotenv import load_dotenv
+from dedup import LinkIndex
+from metrics import METRICS, SIZE_BUCKETS, RateLimitedLog
+from analysis import ORIGINALS_ONLY, TEXT_FIELDS, SkillTagger
+from trends import rollup_increments, utc_now
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,6 +23,11 @@ load_dotenv()
 MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
 MONGODB_DB = os.getenv("MONGODB_DB", "jobs")
 MONGODB_COLLECTION = os.getenv("MONGODB_COLLECTION", "ads")
+MONGODB_CHUNK_SIZE = int(os.getenv("MONGODB_CHUNK_SIZE", "1000"))
+SQLITE_PATH = os.getenv("SQLITE_PATH", "is_ilanlari.db")
+DB_BACKEND = os.getenv("DB_BACKEND", "mongodb")
+NEAR_DUP_MODE = os.getenv("NEAR_DUP_MODE", "off")  # off | tag | skip
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))
 
 # -------------------------------------------------------
 # LOGGING SETUP
@@ -28,13 +40,51 @@ logging.basicConfig(
 # -------------------------------------------------------
 # 1. Dataclass (High Score)
 # -------------------------------------------------------
-@dataclass
+@dataclass(slots=True)
 class JobPosting:
-    """Represents a single cleaned job posting."""
+    """
+    Represents a single cleaned job posting. Save batches carry these slotted
+    objects from cleaning through dedup, near-dup and tagging and turn them
+    into documents only at write time (to_dict), so a batch never holds a
+    dict per posting. get()/[] keep the code that reads posting dicts working.
+    """
     job_title: str
     company_name: str
     summary_description: str
     ad_link: str
+    # Filled once at ingest by SkillTagger
+    skills: list[str] = field(default_factory=list)
+    categories: list[str] = field(default_factory=list)
+    # Set when the posting is stored for the first time (UTC)
+    first_seen: datetime | None = None
+    # Ad link of the original when NearDuplicateDetector tagged this as a copy
+    near_duplicate_of: str | None = None
+
+    @classmethod
+    def from_dict(cls, doc: dict) -> "JobPosting":
+        return cls(
+            job_title=doc.get("job_title") or "",
+            company_name=doc.get("company_name") or "",
+            summary_description=doc.get("summary_description") or "",
+            ad_link=doc.get("ad_link") or "",
+            skills=list(doc.get("skills") or []),
+            categories=list(doc.get("categories") or []),
+            first_seen=doc.get("first_seen"),
+            near_duplicate_of=doc.get("near_duplicate_of"),
+        )
+
+    def to_dict(self) -> dict:
+        """The document the backends store."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def get(self, name: str, default=None):
+        return getattr(self, name, default)
+
+    def __getitem__(self, name: str):
+        return getattr(self, name)
+
+    def __setitem__(self, name: str, value):
+        setattr(self, name, value)
 
 
 # -------------------------------------------------------
@@ -42,15 +92,145 @@ class JobPosting:
 # -------------------------------------------------------
 class IDatabase(ABC):
     @abstractmethod
-    def save_postings(self, postings: list[dict]):
-        """Save multiple postings into the database."""
+    def save_postings(self, postings: list[dict], cleaned: bool = False):
+        """Save multiple postings into the database; cleaned=True skips the cleaning pipeline."""
+        pass
+
+    @abstractmethod
+    def iter_postings(self, projection=None, batch_size=None):
+        """Stream stored postings; `projection` is a Mongo-style {field: 1} dict."""
+        pass
+
+    @abstractmethod
+    def count_with_skills(self, skills: list[str]) -> int:
+        """Number of postings tagged with every one of `skills`."""
+        pass
+
+    @abstractmethod
+    def top_skills(self, company=None, limit=10) -> list[tuple[str, int]]:
+        """Most frequent skills, optionally for one company only."""
+        pass
+
+    @abstractmethod
+    def corpus_version(self) -> str:
+        """
+        Names the store and changes whenever postings are added or removed;
+        keys the report cache, so two stores never share a cached report.
+        """
+        pass
+
+    @abstractmethod
+    def backfill_skills(self, force=False) -> int:
+        """Tags stored postings that have no skills yet (all of them with force)."""
+        pass
+
+    @abstractmethod
+    def record_rollups(self, increments):
+        """Adds {(period, bucket, kind, name): n} to the stored trend rollups."""
+        pass
+
+    @abstractmethod
+    def query_rollups(self, period, kind, name, start, end) -> dict[str, int]:
+        """Rollup counts {bucket: n} for start <= bucket <= end (ISO dates)."""
+        pass
+
+    # ----------------------- LAZY WRITE INDEXES ----------------------- #
+    def _setup_indexes(self, dedup_index, near_dup):
+        """
+        Keeps the indexes passed in; missing ones are built from the store on
+        first use, i.e. the first save, so read-only commands never scan it.
+        """
+        self._dedup_index = dedup_index
+        self._near_dup = near_dup
+        self._near_dup_ready = near_dup is not None
+
+    def _load_dedup_index(self) -> LinkIndex:
+        return LinkIndex().load(self._iter_links())
+
+    @property
+    def dedup_index(self) -> LinkIndex:
+        if self._dedup_index is None:
+            self._dedup_index = self._load_dedup_index()
+        return self._dedup_index
+
+    @property
+    def near_dup(self):
+        """The given detector, or one built from .env when NEAR_DUP_MODE is on."""
+        if not self._near_dup_ready:
+            self._near_dup_ready = True
+            if NEAR_DUP_MODE != "off":
+                # Imported lazily: MinHash needs numpy, which plain ingest does not
+                from near_dup import SIGNATURE_FIELDS, NearDuplicateDetector
+                projection = {"_id": 0, "ad_link": 1, **{f: 1 for f in SIGNATURE_FIELDS}}
+                self._near_dup = NearDuplicateDetector(NEAR_DUP_THRESHOLD, NEAR_DUP_MODE).load(
+                    self.iter_postings(projection)
+                )
+        return self._near_dup
+
+    def _filter_near_duplicates(self, docs: list[JobPosting]) -> list[JobPosting]:
+        return self.near_dup.filter(docs) if self.near_dup is not None else docs
+
+    def _clean_batch(self, postings: list[dict], cleaned: bool) -> list[JobPosting]:
+        """
+        Slotted JobPostings for a save batch; runs the cleaning pipeline unless
+        the postings were cleaned upstream (see ingest.py).
+        """
+        if cleaned:
+            return [p if isinstance(p, JobPosting) else JobPosting.from_dict(p) for p in postings]
+        return self.cleaning.clean_batch(postings, into=JobPosting.from_dict)
+
+    def _tag_and_stamp(self, docs: list[JobPosting]) -> list[JobPosting]:
+        """Skill tags and first_seen for postings that are about to be stored."""
+        now = utc_now()
+        for doc in docs:
+            self.tagger.tag_posting(doc)
+            # Imported postings (see columnar.py) keep the date they were first seen
+            seen = doc.get("first_seen")
+            doc["first_seen"] = datetime.fromisoformat(seen) if isinstance(seen, str) else seen or now
+        return docs
+
+    def _record_save(self, received: int, inserted: int):
+        """Per-batch ingest metrics, see metrics.py."""
+        METRICS.observe("save_batch_size", received, SIZE_BUCKETS)
+        METRICS.inc("postings_received", received)
+        METRICS.inc("postings_inserted", inserted)
+        METRICS.inc("postings_skipped", received - inserted)
+
+    def find_all_postings(self) -> list[dict]:
+        """Materialises every posting. Prefer iter_postings for large stores."""
+        return list(self.iter_postings())
+
+    def close(self):
+        """Release connections held by the backend."""
         pass
 
 
+# Backend name -> class, filled by @register_backend and used by get_database()
+BACKENDS: dict[str, type] = {}
+
+
+def register_backend(name: str):
+    def decorator(cls):
+        BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def get_database(name=None, **kwargs) -> IDatabase:
+    """Creates the backend chosen by `name` or DB_BACKEND in .env."""
+    name = name or DB_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown database backend '{name}'. Available: {sorted(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
+
+
 # -------------------------------------------------------
 # 3. Cleaner Classes (Inheritance)
 # -------------------------------------------------------
 class BaseCleaner:
+    # Removal pattern of the cleaner; cleaners with one can be fused
+    PATTERN = None
+
     def clean(self, text: str) -> str:
         return text.strip() if text else ""
 
@@ -58,17 +238,21 @@ class BaseCleaner:
 class HTMLCleaner(BaseCleaner):
     """Removes HTML tags."""
 
+    PATTERN = re.compile(r"<.*?>")
+
     def clean(self, text: str) -> str:
         base = super().clean(text)
-        return re.sub(r"<.*?>", "", base)
+        return self.PATTERN.sub("", base)
 
 
 class EmojiCleaner(BaseCleaner):
     """Removes emojis and unusual symbols."""
 
+    PATTERN = re.compile(r"[^\w\s,.!?-ğüşöçıİĞÜŞÖÇ]")
+
     def clean(self, text: str) -> str:
         base = super().clean(text)
-        return re.sub(r"[^\w\s,.!?-ğüşöçıİĞÜŞÖÇ]", "", base)
+        return self.PATTERN.sub("", base)
 
 
 class StopwordCleaner(BaseCleaner):
@@ -83,76 +267,702 @@ class StopwordCleaner(BaseCleaner):
 
 
 # -------------------------------------------------------
-# 4. MongoDB Manager (Enhanced Version)
+# 4. Cleaning Pipeline (Fused)
+# -------------------------------------------------------
+class CleaningPipeline:
+    """
+    Applies a list of cleaners to each posting field in as few passes as
+    possible. Neighbouring pattern cleaners are merged into one alternation
+    (one re.sub instead of one per cleaner) and the stopword filter runs once
+    on the split words. Fusing assumes no removal can create a new match for
+    another one, which holds for the HTML and emoji cleaners.
+    """
+
+    TEXT_FIELDS = ("job_title", "company_name", "summary_description")
+
+    def __init__(self, steps: dict[str, list[BaseCleaner]]):
+        self.steps = steps
+        self._passes = {field: self._fuse(cleaners) for field, cleaners in steps.items()}
+
+    @classmethod
+    def for_all_fields(cls, cleaners: list[BaseCleaner]) -> "CleaningPipeline":
+        return cls({field: list(cleaners) for field in cls.TEXT_FIELDS})
+
+    # ----------------------- FUSING ----------------------- #
+    @staticmethod
+    def _fuse(cleaners: list[BaseCleaner]) -> list[tuple]:
+        passes: list[tuple] = []
+        for cleaner in cleaners:
+            if cleaner.PATTERN is not None:
+                if passes and passes[-1][0] == "sub":
+                    merged = f"{passes[-1][1].pattern}|{cleaner.PATTERN.pattern}"
+                    passes[-1] = ("sub", re.compile(merged))
+                else:
+                    passes.append(("sub", cleaner.PATTERN))
+            elif isinstance(cleaner, StopwordCleaner):
+                passes.append(("words", frozenset(cleaner.STOPWORDS)))
+            else:
+                passes.append(("clean", cleaner))
+        return passes
+
+    # ----------------------- CLEAN ----------------------- #
+    def clean_text(self, field: str, text: str) -> str:
+        text = text.strip() if text else ""
+        for kind, step in self._passes.get(field, ()):
+            if kind == "sub":
+                text = step.sub("", text)
+            elif kind == "words":
+                text = " ".join([w for w in text.split() if w.lower() not in step])
+            else:
+                text = step.clean(text)
+        return text
+
+    def clean(self, posting: dict) -> dict:
+        """Returns a cleaned copy of the posting; the input is left untouched."""
+        cleaned = dict(posting)
+        for field in self._passes:
+            cleaned[field] = self.clean_text(field, posting.get(field, ""))
+        return cleaned
+
+    def clean_batch(self, postings, into=None) -> list:
+        """Cleaned copies; `into` converts each one right away (e.g. JobPosting.from_dict)."""
+        with METRICS.timer("clean"):
+            if into is None:
+                cleaned = [self.clean(p) for p in postings]
+            else:
+                cleaned = [into(self.clean(p)) for p in postings]
+        METRICS.inc("postings_cleaned", len(cleaned))
+        return cleaned
+
+
+# Field-specific cleaning MongoDBManager has always applied
+DEFAULT_CLEANING = CleaningPipeline({
+    "job_title": [HTMLCleaner(), StopwordCleaner()],
+    "company_name": [HTMLCleaner()],
+    "summary_description": [EmojiCleaner()],
+})
+
+# HTML, emoji and stopword cleaning on every text field
+FULL_CLEANING = CleaningPipeline.for_all_fields(
+    [HTMLCleaner(), EmojiCleaner(), StopwordCleaner()]
+)
+
+
+# -------------------------------------------------------
+# 5. MongoDB Manager (Enhanced Version)
 # -------------------------------------------------------
+@register_backend("mongodb")
 class MongoDBManager(IDatabase):
     """Handles all DB logic with robustness."""
 
-    def __init__(self, uri=None, db=None, collection=None):
+    def __init__(self, uri=None, db=None, collection=None, client=None,
+                 bulk=True, chunk_size=None, cleaning=None, dedup_index=None, tagger=None,
+                 near_dup=None):
         # Use environment variables if parameters are not provided
         self.uri = uri or MONGODB_URI
         self.db_name = db or MONGODB_DB
         self.collection_name = collection or MONGODB_COLLECTION
-        
+        self.bulk = bulk
+        self.chunk_size = chunk_size or MONGODB_CHUNK_SIZE
+
         logging.info(f"Connecting to MongoDB: {self.uri}/{self.db_name}/{self.collection_name}")
 
-        # cleaners
-        self.html_cleaner = HTMLCleaner()
-        self.emoji_cleaner = EmojiCleaner()
-        self.stopword_cleaner = StopwordCleaner()
+        # Every posting goes through this pipeline exactly once on save
+        self.cleaning = cleaning or DEFAULT_CLEANING
+        self.tagger = tagger or SkillTagger()
+
+        self._owns_client = client is None
+        if client is not None:
+            # Reuse an existing client (e.g. mongomock in benchmarks)
+            self.collection = client[self.db_name][self.collection_name]
+        else:
+            self.collection = self._connect_with_retry()
+        # Daily / weekly skill and category counts, see trends.py
+        self.trends = self.collection.database[f"{self.collection_name}_trends"]
+        self._ensure_indexes()
 
-        self.collection = self._connect_with_retry()
+        # Known links, loaded on the first save; most duplicate checks are answered from memory
+        self._setup_indexes(dedup_index, near_dup)
+        self._duplicate_log = RateLimitedLog("Duplicate skipped")
 
     # ----------------------- DB CONNECTION ----------------------- #
     def _connect_with_retry(self):
-        """Retry DB connection 3 times for robustness."""
-        for attempt in range(3):
-            try:
-                client = MongoClient(self.uri, serverSelectionTimeoutMS=1000)
-                client.server_info()
-                logging.info("Connected to MongoDB successfully.")
-                return client[self.db_name][self.collection_name]
-            except errors.ServerSelectionTimeoutError:
-                logging.warning(f"MongoDB connection failed. Retrying ({attempt + 1}/3)...")
-                time.sleep(1)
+        """Borrows the process-wide pooled client for self.uri, see mongo_pool.py."""
+        import mongo_pool
 
-        logging.error("Could not connect to MongoDB after 3 attempts.")
-        raise ConnectionError("MongoDB is unreachable.")
+        return mongo_pool.acquire(self.uri)[self.db_name][self.collection_name]
+
+    def _ensure_indexes(self):
+        """Unique index on ad_link so concurrent writers cannot insert the same ad."""
+        from pymongo import errors
+
+        try:
+            self.collection.create_index("ad_link", unique=True)
+        except errors.OperationFailure as e:
+            # Happens when the collection already holds duplicates
+            logging.warning(f"Could not create unique index on ad_link: {e}")
+        # Multikey indexes: skill -> postings, and per company
+        self.collection.create_index("skills")
+        self.collection.create_index([("company_name", 1), ("skills", 1)])
+        self.trends.create_index([("period", 1), ("kind", 1), ("name", 1), ("bucket", 1)])
 
     # ----------------------- CLEAN POSTING ----------------------- #
     def _clean_posting(self, posting: dict) -> JobPosting:
-        """Cleans and returns JobPosting object using multiple cleaners."""
-        return JobPosting(
-            job_title=self.stopword_cleaner.clean(
-                self.html_cleaner.clean(posting.get("job_title", ""))
-            ),
-            company_name=self.html_cleaner.clean(posting.get("company_name", "")),
-            summary_description=self.emoji_cleaner.clean(posting.get("summary_description", "")),
-            ad_link=posting.get("ad_link", "")
-        )
+        """Cleans and returns JobPosting object using the cleaning pipeline."""
+        return JobPosting.from_dict(self.cleaning.clean(posting))
 
     # ----------------------- CHECK DUPLICATE ----------------------- #
     def _exists(self, url: str) -> bool:
+        if not self.dedup_index.might_contain(url):
+            return False
+        if not self.dedup_index.bloom:
+            return True
+        # Bloom filter said "maybe": confirm against the collection
         return self.collection.count_documents({"ad_link": url}, limit=1) > 0
 
+    def _existing_links(self, links: list[str]) -> set[str]:
+        """One $in query for a batch of links the dedup index could not rule out."""
+        cursor = self.collection.find({"ad_link": {"$in": links}}, {"_id": 0, "ad_link": 1})
+        return {d["ad_link"] for d in cursor}
+
+    def _iter_links(self):
+        for d in self.iter_postings({"_id": 0, "ad_link": 1}):
+            yield d.get("ad_link")
+
+    # ----------------------- READ POSTINGS ----------------------- #
+    def iter_postings(self, projection=None, batch_size=None):
+        """Streams stored postings from a cursor instead of building a list."""
+        return self.collection.find(
+            {}, projection or {"_id": 0}, batch_size=batch_size or self.chunk_size
+        )
+
+    def corpus_version(self) -> str:
+        latest = self.collection.find_one({}, {"_id": 1}, sort=[("_id", -1)])
+        count = self.collection.estimated_document_count()
+        return f"mongodb:{self.uri}/{self.collection.full_name}:{count}:{latest['_id'] if latest else ''}"
+
+    def close(self):
+        # A client passed in by the caller is theirs to close
+        if self._owns_client:
+            import mongo_pool
+
+            mongo_pool.release(self.uri)
+            self._owns_client = False
+
     # ----------------------- SAVE POSTINGS ----------------------- #
-    def save_postings(self, postings: list[dict]):
+    def save_postings(self, postings: list[dict], cleaned: bool = False):
         """
         Cleans and inserts unique job postings into MongoDB.
         Returns the list of newly added documents.
         """
+        if not self.bulk:
+            return self._save_one_by_one(postings, cleaned)
+
+        # Clean once and drop duplicates inside the batch itself (first one wins)
+        unique_docs = {}
+        for job in self._clean_batch(postings, cleaned):
+            unique_docs.setdefault(job.ad_link, job)
+        new_links = self.dedup_index.filter_new(list(unique_docs), self._existing_links)
+        docs = [d for link, d in unique_docs.items() if link in new_links]
+        docs = self._tag_and_stamp(self._filter_near_duplicates(docs))
+
+        inserted = []
+        with METRICS.timer("insert"):
+            for start in range(0, len(docs), self.chunk_size):
+                inserted.extend(self._upsert_chunk(docs[start:start + self.chunk_size]))
+            self.record_rollups(rollup_increments(inserted))
+        # All of them are stored now, whether we or another writer inserted them
+        self.dedup_index.update(new_links)
+        self._record_save(len(postings), len(inserted))
+
+        skipped = len(postings) - len(inserted)
+        if skipped:
+            logging.info(f"Skipped {skipped} duplicate job postings.")
+        if inserted:
+            logging.info(f"Inserted {len(inserted)} new job postings.")
+
+        return inserted
+
+    def _upsert_chunk(self, jobs: list[JobPosting]) -> list[dict]:
+        """
+        One unordered bulk_write of $setOnInsert upserts. Existing links are
+        left untouched, so only the upserted entries are new documents.
+        """
+        from pymongo import UpdateOne, errors
+
+        # Write time: the only place the chunk exists as documents
+        docs = [job.to_dict() for job in jobs]
+        requests = [
+            UpdateOne({"ad_link": d["ad_link"]}, {"$setOnInsert": d}, upsert=True)
+            for d in docs
+        ]
+        try:
+            upserted = self.collection.bulk_write(requests, ordered=False).upserted_ids
+        except errors.BulkWriteError as e:
+            # Duplicate key errors mean another writer inserted the link first
+            upserted = {u["index"]: u["_id"] for u in e.details.get("upserted", [])}
+            others = [w for w in e.details.get("writeErrors", []) if w.get("code") != 11000]
+            if others:
+                raise
+
+        new_docs = []
+        for index, _id in sorted(upserted.items()):
+            docs[index]["_id"] = _id
+            new_docs.append(docs[index])
+        return new_docs
+
+    def _save_one_by_one(self, postings: list[dict], cleaned: bool = False):
+        """Original path: one duplicate query per posting, then insert_many."""
         cleaned_docs = []
+        seen = set()
 
         for p in postings:
-            job = self._clean_posting(p)
+            job = JobPosting.from_dict(p) if cleaned else self._clean_posting(p)
 
-            if not self._exists(job.ad_link):
-                cleaned_docs.append(job.__dict__)
+            if job.ad_link not in seen and not self._exists(job.ad_link):
+                seen.add(job.ad_link)
+                cleaned_docs.append(job)
             else:
-                logging.info(f"Duplicate skipped: {job.ad_link}")
+                # One aggregated line instead of one per duplicate
+                self._duplicate_log.hit(job.ad_link)
+        self._duplicate_log.flush()
 
+        cleaned_docs = self._filter_near_duplicates(cleaned_docs)
+        cleaned_docs = [job.to_dict() for job in self._tag_and_stamp(cleaned_docs)]
         if cleaned_docs:
-            self.collection.insert_many(cleaned_docs)
+            with METRICS.timer("insert"):
+                self.collection.insert_many(cleaned_docs)
+                self.record_rollups(rollup_increments(cleaned_docs))
+            self.dedup_index.update(seen)
             logging.info(f"Inserted {len(cleaned_docs)} new job postings.")
+        self._record_save(len(postings), len(cleaned_docs))
+
+        return cleaned_docs
+
+    # ----------------------- SKILL QUERIES ----------------------- #
+    def count_with_skills(self, skills: list[str]) -> int:
+        # Copies tagged by near_dup.py are stored but never counted
+        return self.collection.count_documents({"skills": {"$all": list(skills)}, **ORIGINALS_ONLY})
+
+    def top_skills(self, company=None, limit=10) -> list[tuple[str, int]]:
+        match = {"company_name": company} if company is not None else {}
+        match.update(ORIGINALS_ONLY)
+        rows = self.collection.aggregate([
+            {"$match": match},
+            {"$unwind": "$skills"},
+            {"$group": {"_id": "$skills", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": limit},
+        ])
+        return [(r["_id"], r["count"]) for r in rows]
+
+    def backfill_skills(self, force=False) -> int:
+        """Re-tags stored postings in chunks of bulk $set updates."""
+        from pymongo import UpdateOne
+
+        query = {} if force else {"skills": {"$exists": False}}
+        projection = {"_id": 1, **{f: 1 for f in TEXT_FIELDS}}
+        updated, requests = 0, []
+        for doc in self.collection.find(query, projection, batch_size=self.chunk_size):
+            skills, categories = self.tagger.tag(doc)
+            requests.append(UpdateOne(
+                {"_id": doc["_id"]}, {"$set": {"skills": skills, "categories": categories}}
+            ))
+            if len(requests) >= self.chunk_size:
+                updated += self.collection.bulk_write(requests, ordered=False).modified_count
+                requests = []
+        if requests:
+            updated += self.collection.bulk_write(requests, ordered=False).modified_count
+        logging.info(f"Backfilled skills for {updated} postings.")
+        return updated
+
+    # ----------------------- TREND ROLLUPS ----------------------- #
+    def record_rollups(self, increments):
+        from pymongo import UpdateOne
+
+        requests = [
+            UpdateOne(
+                {"period": period, "bucket": bucket, "kind": kind, "name": name},
+                {"$inc": {"count": n}},
+                upsert=True,
+            )
+            for (period, bucket, kind, name), n in increments.items()
+        ]
+        if requests:
+            self.trends.bulk_write(requests, ordered=False)
+
+    def query_rollups(self, period, kind, name, start, end) -> dict[str, int]:
+        rows = self.trends.find(
+            {"period": period, "kind": kind, "name": name, "bucket": {"$gte": start, "$lte": end}},
+            {"_id": 0, "bucket": 1, "count": 1},
+        )
+        return {r["bucket"]: r["count"] for r in rows}
+
+
+# -------------------------------------------------------
+# 6. SQLite Manager (Embedded, File Based)
+# -------------------------------------------------------
+@register_backend("sqlite")
+class SQLiteManager(IDatabase):
+    """
+    Stores postings in a local SQLite file (WAL mode, unique ad_link).
+    Skill tags are kept as JSON columns plus a (skill, posting_id) table
+    that acts as the inverted index.
+    """
+
+    COLUMNS = ("job_title", "company_name", "summary_description", "ad_link")
+    TAG_COLUMNS = ("skills", "categories")
+    # Columns added after the first release; old files get them on open
+    LATE_COLUMNS = TAG_COLUMNS + ("first_seen", "near_duplicate_of")
+    # Stay well below SQLite's limit on bound parameters per statement
+    MAX_PARAMS = 500
+
+    def __init__(self, path=None, chunk_size=None, cleaning=None, dedup_index=None, tagger=None,
+                 near_dup=None):
+        self.path = path or SQLITE_PATH
+        self.chunk_size = chunk_size or MONGODB_CHUNK_SIZE
+        self.cleaning = cleaning or DEFAULT_CLEANING
+        self.tagger = tagger or SkillTagger()
+        self._store_id = uuid.uuid4().hex
+
+        logging.info(f"Opening SQLite database: {self.path}")
+        # Autocommit mode; write batches open their own transactions
+        self.conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+
+        self._setup_indexes(dedup_index, near_dup)
+
+    def _create_schema(self):
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS ads ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "job_title TEXT, company_name TEXT, summary_description TEXT, "
+            "ad_link TEXT NOT NULL, skills TEXT, categories TEXT, first_seen TEXT, "
+            "near_duplicate_of TEXT)"
+        )
+        present = {row[1] for row in self.conn.execute("PRAGMA table_info(ads)")}
+        for column in self.LATE_COLUMNS:
+            if column not in present:
+                self.conn.execute(f"ALTER TABLE ads ADD COLUMN {column} TEXT")
+        self.conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ads_ad_link ON ads (ad_link)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS ads_company ON ads (company_name)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS posting_skills ("
+            "skill TEXT NOT NULL, posting_id INTEGER NOT NULL, "
+            "PRIMARY KEY (skill, posting_id)) WITHOUT ROWID"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS skill_trends ("
+            "period TEXT NOT NULL, kind TEXT NOT NULL, name TEXT NOT NULL, "
+            "bucket TEXT NOT NULL, count INTEGER NOT NULL, "
+            "PRIMARY KEY (period, kind, name, bucket)) WITHOUT ROWID"
+        )
+
+    # ----------------------- CHECK DUPLICATE ----------------------- #
+    def _existing_links(self, links: list[str]) -> set[str]:
+        return set(self._ids_for_links(links))
+
+    def _ids_for_links(self, links: list[str]) -> dict[str, int]:
+        found = {}
+        for start in range(0, len(links), self.MAX_PARAMS):
+            part = links[start:start + self.MAX_PARAMS]
+            marks = ",".join("?" * len(part))
+            rows = self.conn.execute(f"SELECT ad_link, id FROM ads WHERE ad_link IN ({marks})", part)
+            found.update(rows)
+        return found
+
+    def _iter_links(self):
+        for row in self.conn.execute("SELECT ad_link FROM ads"):
+            yield row[0]
+
+    # ----------------------- READ POSTINGS ----------------------- #
+    def iter_postings(self, projection=None, batch_size=None):
+        """Streams rows with fetchmany, mapping `id` to `_id` when it is asked for."""
+        columns = list(self.COLUMNS + self.LATE_COLUMNS)
+        with_id = False
+        if projection:
+            wanted = [k for k, keep in projection.items() if keep]
+            with_id = bool(projection.get("_id"))
+            columns = [c for c in columns if c in wanted] or columns
+        select = (["id"] if with_id else []) + columns
+        names = (["_id"] if with_id else []) + columns
+
+        cursor = self.conn.execute(f"SELECT {', '.join(select)} FROM ads ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(batch_size or self.chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                doc = dict(zip(names, row))
+                for column in self.TAG_COLUMNS:
+                    if column in doc:
+                        doc[column] = json.loads(doc[column]) if doc[column] else []
+                yield doc
+
+    # ----------------------- SAVE POSTINGS ----------------------- #
+    def save_postings(self, postings: list[dict], cleaned: bool = False):
+        """
+        Cleans postings and inserts the new ones with one executemany per
+        chunk. Returns the list of newly added documents.
+        """
+        unique_docs = {}
+        for job in self._clean_batch(postings, cleaned):
+            unique_docs.setdefault(job.ad_link, job)
+        new_links = self.dedup_index.filter_new(list(unique_docs), self._existing_links)
+        docs = [d for link, d in unique_docs.items() if link in new_links]
+        docs = self._tag_and_stamp(self._filter_near_duplicates(docs))
+
+        inserted = []
+        with METRICS.timer("insert"):
+            for start in range(0, len(docs), self.chunk_size):
+                inserted.extend(self._insert_chunk(docs[start:start + self.chunk_size]))
+            self.record_rollups(rollup_increments(inserted))
+        self.dedup_index.update(new_links)
+        self._record_save(len(postings), len(inserted))
+
+        skipped = len(postings) - len(inserted)
+        if skipped:
+            logging.info(f"Skipped {skipped} duplicate job postings.")
+        if inserted:
+            logging.info(f"Inserted {len(inserted)} new job postings.")
+        return inserted
+
+    def _insert_chunk(self, docs: list[JobPosting]) -> list[dict]:
+        columns = self.COLUMNS + self.LATE_COLUMNS
+        # BEGIN IMMEDIATE takes the write lock, so the re-check below is race free
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = self._existing_links([d["ad_link"] for d in docs])
+            fresh = [d for d in docs if d["ad_link"] not in existing]
+            self.conn.executemany(
+                f"INSERT INTO ads ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [self._row(d) for d in fresh],
+            )
+            ids = self._ids_for_links([d["ad_link"] for d in fresh])
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO posting_skills (skill, posting_id) VALUES (?, ?)",
+                [(skill, ids[d["ad_link"]]) for d in fresh for skill in d.get("skills", [])],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return [job.to_dict() for job in fresh]
+
+    def _row(self, doc: JobPosting) -> tuple:
+        text = tuple(doc.get(c, "") for c in self.COLUMNS)
+        tags = tuple(json.dumps(doc.get(c, []), ensure_ascii=False) for c in self.TAG_COLUMNS)
+        seen = doc.get("first_seen")
+        return text + tags + (seen.isoformat() if seen else None, doc.get("near_duplicate_of"))
+
+    # ----------------------- SKILL QUERIES ----------------------- #
+    def count_with_skills(self, skills: list[str]) -> int:
+        skills = list(dict.fromkeys(skills))
+        if not skills:
+            return self.conn.execute(
+                "SELECT COUNT(*) FROM ads WHERE near_duplicate_of IS NULL"
+            ).fetchone()[0]
+        marks = ",".join("?" * len(skills))
+        # Copies tagged by near_dup.py are stored but never counted
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM (SELECT ps.posting_id FROM posting_skills ps "
+            "JOIN ads a ON a.id = ps.posting_id WHERE a.near_duplicate_of IS NULL "
+            f"AND ps.skill IN ({marks}) GROUP BY ps.posting_id HAVING COUNT(*) = ?)",
+            [*skills, len(skills)],
+        ).fetchone()[0]
+
+    def top_skills(self, company=None, limit=10) -> list[tuple[str, int]]:
+        where, params = "a.near_duplicate_of IS NULL", []
+        if company is not None:
+            where, params = f"{where} AND a.company_name = ?", [company]
+        query = (
+            "SELECT ps.skill, COUNT(*) AS n FROM posting_skills ps "
+            f"JOIN ads a ON a.id = ps.posting_id WHERE {where} GROUP BY ps.skill"
+        )
+        rows = self.conn.execute(f"{query} ORDER BY n DESC, 1 LIMIT ?", [*params, limit])
+        return [(skill, count) for skill, count in rows]
+
+    def backfill_skills(self, force=False) -> int:
+        """Re-tags stored rows chunk by chunk, walking the table by id."""
+        where = "" if force else "AND skills IS NULL"
+        updated, last_id = 0, 0
+        while True:
+            rows = self.conn.execute(
+                f"SELECT id, {', '.join(TEXT_FIELDS)} FROM ads WHERE id > ? {where} "
+                "ORDER BY id LIMIT ?", (last_id, self.chunk_size),
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            tagged = [(row[0], *self.tagger.tag(dict(zip(TEXT_FIELDS, row[1:])))) for row in rows]
+
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(
+                    "UPDATE ads SET skills = ?, categories = ? WHERE id = ?",
+                    [(json.dumps(sk, ensure_ascii=False), json.dumps(cat, ensure_ascii=False), i)
+                     for i, sk, cat in tagged],
+                )
+                self.conn.executemany(
+                    "DELETE FROM posting_skills WHERE posting_id = ?", [(i,) for i, _, _ in tagged]
+                )
+                self.conn.executemany(
+                    "INSERT INTO posting_skills (skill, posting_id) VALUES (?, ?)",
+                    [(skill, i) for i, sk, _ in tagged for skill in sk],
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            updated += len(tagged)
+        logging.info(f"Backfilled skills for {updated} postings.")
+        return updated
+
+    # ----------------------- TREND ROLLUPS ----------------------- #
+    def record_rollups(self, increments):
+        if not increments:
+            return
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.executemany(
+                "INSERT INTO skill_trends (period, bucket, kind, name, count) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (period, kind, name, bucket) DO UPDATE SET count = count + excluded.count",
+                [(*key, n) for key, n in increments.items()],
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def query_rollups(self, period, kind, name, start, end) -> dict[str, int]:
+        rows = self.conn.execute(
+            "SELECT bucket, count FROM skill_trends "
+            "WHERE period = ? AND kind = ? AND name = ? AND bucket BETWEEN ? AND ?",
+            (period, kind, name, start, end),
+        )
+        return dict(rows)
+
+    def corpus_version(self) -> str:
+        count, last_id = self.conn.execute("SELECT COUNT(*), MAX(id) FROM ads").fetchone()
+        # ":memory:" databases are private to this connection, like InMemoryDBManager
+        store = self._store_id if self.path == ":memory:" else os.path.realpath(self.path)
+        return f"sqlite:{store}:{count}:{last_id or ''}"
+
+    def close(self):
+        self.conn.close()
+
+
+# -------------------------------------------------------
+# 7. In-Memory Manager (Fallback / Tests)
+# -------------------------------------------------------
+@register_backend("memory")
+class InMemoryDBManager(IDatabase):
+    """Simple in-memory DB replacement; data is lost when the process exits."""
+
+    def __init__(self, cleaning=None, dedup_index=None, tagger=None, near_dup=None, **_):
+        self.cleaning = cleaning or DEFAULT_CLEANING
+        self.tagger = tagger or SkillTagger()
+        self._store: list[dict] = []
+        self._store_id = uuid.uuid4().hex
+        # skill -> positions in _store
+        self._skill_index: dict[str, set[int]] = {}
+        self._rollups = Counter()
+        self._setup_indexes(dedup_index, near_dup)
+
+    def _load_dedup_index(self) -> LinkIndex:
+        # The store is the process memory, so an exact index is the store check
+        return LinkIndex(bloom=False)
+
+    def clean_posting(self, posting: dict) -> dict:
+        return self.cleaning.clean(posting)
+
+    def save_postings(self, postings: list[dict], cleaned: bool = False):
+        new = []
+        with METRICS.timer("dedup"):
+            for p in self._clean_batch(postings, cleaned):
+                if not self.dedup_index.might_contain(p.get("ad_link")):
+                    self.dedup_index.add(p.get("ad_link"))
+                    new.append(p)
+        new = [job.to_dict() for job in self._tag_and_stamp(self._filter_near_duplicates(new))]
+        with METRICS.timer("insert"):
+            for p in new:
+                self._index(len(self._store), p)
+                self._store.append(p)
+            self.record_rollups(rollup_increments(new))
+        self._record_save(len(postings), len(new))
+        logging.info(f"(InMemory) Inserted {len(new)} postings.")
+        return new
+
+    def _index(self, position: int, posting: dict):
+        # Copies tagged by near_dup.py are stored but never counted
+        if posting.get("near_duplicate_of"):
+            return
+        for skill in posting.get("skills", []):
+            self._skill_index.setdefault(skill, set()).add(position)
+
+    def corpus_version(self) -> str:
+        # Unique per instance, so the disk tier of the report cache never matches it elsewhere
+        return f"memory:{self._store_id}:{len(self._store)}"
+
+    def iter_postings(self, projection=None, batch_size=None):
+        for p in self._store:
+            yield {k: p.get(k) for k, keep in projection.items() if keep} if projection else p
+
+    # ----------------------- SKILL QUERIES ----------------------- #
+    def count_with_skills(self, skills: list[str]) -> int:
+        if not skills:
+            return sum(1 for p in self._store if not p.get("near_duplicate_of"))
+        sets = sorted((self._skill_index.get(s, set()) for s in skills), key=len)
+        return len(sets[0].intersection(*sets[1:]))
+
+    def top_skills(self, company=None, limit=10) -> list[tuple[str, int]]:
+        counts = Counter()
+        for skill, positions in self._skill_index.items():
+            if company is None:
+                counts[skill] = len(positions)
+            else:
+                counts[skill] = sum(1 for i in positions if self._store[i].get("company_name") == company)
+        ranked = sorted(((s, c) for s, c in counts.items() if c), key=lambda sc: (-sc[1], sc[0]))
+        return ranked[:limit]
+
+    def backfill_skills(self, force=False) -> int:
+        updated = 0
+        for position, posting in enumerate(self._store):
+            if force or "skills" not in posting:
+                for skill in posting.get("skills", []):
+                    self._skill_index.get(skill, set()).discard(position)
+                self._index(position, self.tagger.tag_posting(posting))
+                updated += 1
+        return updated
+
+    # ----------------------- TREND ROLLUPS ----------------------- #
+    def record_rollups(self, increments):
+        for (period, bucket, kind, name), n in increments.items():
+            self._rollups[(period, kind, name, bucket)] += n
+
+    def query_rollups(self, period, kind, name, start, end) -> dict[str, int]:
+        return {
+            bucket: n for (p, k, nm, bucket), n in self._rollups.items()
+            if p == period and k == kind and nm == name and start <= bucket <= end
+        }
 
-        return cleaned_docs
\ No newline at end of file
+
+# -------------------------------------------------------
+# COMMAND LINE
+# -------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Database maintenance commands.")
+    parser.add_argument("command", choices=["backfill-skills"])
+    parser.add_argument("--backend", default=DB_BACKEND, choices=sorted(BACKENDS))
+    parser.add_argument("--force", action="store_true", help="Re-tag postings that already have skills.")
+    args = parser.parse_args()
+
+    database = get_database(args.backend)
+    try:
+        database.backfill_skills(force=args.force)
+    finally:
+        database.close()
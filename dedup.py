@@ -0,0 +1,105 @@
+"""
+In-memory index of known ad links, shared by every database backend.
+
+Answers "have we stored this link?" locally so most duplicate checks never
+reach the database. With bloom=True the exact set is replaced by a
+memory-bounded Bloom filter; only its "maybe" answers are confirmed
+against the store.
+"""
+import hashlib
+import logging
+import math
+import os
+
+from dotenv import load_dotenv
+
+from metrics import METRICS
+
+load_dotenv()
+
+# -------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------
+DEDUP_BLOOM = os.getenv("DEDUP_BLOOM", "0") == "1"
+DEDUP_CAPACITY = int(os.getenv("DEDUP_CAPACITY", "1000000"))
+DEDUP_ERROR_RATE = float(os.getenv("DEDUP_ERROR_RATE", "0.01"))
+
+
+# -------------------------------------------------------
+# 1. Bloom Filter
+# -------------------------------------------------------
+class BloomFilter:
+    """Fixed-size bit array sized for `capacity` items at `error_rate` false positives."""
+
+    def __init__(self, capacity: int = DEDUP_CAPACITY, error_rate: float = DEDUP_ERROR_RATE):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        # Double hashing: k positions from the two halves of one digest
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+
+# -------------------------------------------------------
+# 2. Link Index
+# -------------------------------------------------------
+class LinkIndex:
+    """Exact set of links, or a Bloom filter when memory must stay bounded."""
+
+    def __init__(self, bloom: bool = DEDUP_BLOOM, capacity: int = DEDUP_CAPACITY,
+                 error_rate: float = DEDUP_ERROR_RATE):
+        self.bloom = bloom
+        self._links = BloomFilter(capacity, error_rate) if bloom else set()
+
+    def load(self, links):
+        """Fills the index from the links already in the store (done once at startup)."""
+        for link in links:
+            if link:
+                self.add(link)
+        logging.info(f"Dedup index loaded with {len(self)} links (bloom={self.bloom}).")
+        return self
+
+    def add(self, link: str):
+        self._links.add(link)
+
+    def update(self, links):
+        for link in links:
+            self.add(link)
+
+    def might_contain(self, link: str) -> bool:
+        """False means definitely new; True is exact unless bloom is enabled."""
+        return link in self._links
+
+    def __len__(self):
+        return self._links.count if self.bloom else len(self._links)
+
+    # ----------------------- FILTER ----------------------- #
+    def filter_new(self, links: list[str], existing_in_store=None) -> set[str]:
+        """
+        Returns the links that are not stored yet. In bloom mode the possible
+        hits are confirmed with one `existing_in_store(candidates) -> set`
+        call; links the filter has never seen skip the store entirely.
+        """
+        with METRICS.timer("dedup"):
+            maybe = [link for link in links if self.might_contain(link)]
+            known = set(maybe)
+            if self.bloom and maybe and existing_in_store is not None:
+                known = existing_in_store(maybe)
+                METRICS.inc("dedup_store_checks", len(maybe))
+            new = {link for link in links if link not in known}
+        METRICS.inc("dedup_checked", len(links))
+        return new
@@ -0,0 +1,165 @@
+"""
+Pipelined ingest: items -> clean -> save_postings, one thread per stage.
+
+Producers (the spider's item pipeline, `main.py ingest`) submit raw postings
+into a bounded queue. The clean stage gathers them into micro-batches,
+closed by size or by time, and runs the cleaning pipeline; the write stage
+saves each cleaned batch with save_postings(batch, cleaned=True). Both queues
+are bounded, so a slow database fills them and submit() blocks: that is the
+backpressure which throttles the crawler. close() (also run at exit) drains
+and writes everything still in flight.
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from database import JobPosting
+from metrics import METRICS
+
+load_dotenv()
+
+# -------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "100"))
+INGEST_FLUSH_SECONDS = float(os.getenv("INGEST_FLUSH_SECONDS", "2"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "1000"))  # raw items
+INGEST_MAX_BATCHES = int(os.getenv("INGEST_MAX_BATCHES", "4"))  # cleaned batches waiting to be written
+
+_STOP = object()
+
+
+class IngestPipeline:
+    """Bounded clean and write stages in front of an IDatabase."""
+
+    def __init__(self, db, batch_size: int = INGEST_BATCH_SIZE,
+                 flush_seconds: float = INGEST_FLUSH_SECONDS,
+                 queue_size: int = INGEST_QUEUE_SIZE, max_batches: int = INGEST_MAX_BATCHES):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.items: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.batches: queue.Queue = queue.Queue(maxsize=max_batches)
+        self.received = 0
+        self.inserted = 0
+        self.error = None
+        self._closed = False
+        self._lock = threading.Lock()
+        # Producers inside submit(); close() waits for them before it enqueues _STOP
+        self._producers = 0
+        self._idle = threading.Condition(self._lock)
+        self._threads = [
+            threading.Thread(target=self._clean_stage, name="ingest-clean", daemon=True),
+            threading.Thread(target=self._write_stage, name="ingest-write", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        atexit.register(self.close)
+
+    # ----------------------- PRODUCER SIDE ----------------------- #
+    def submit(self, posting: dict, timeout=None):
+        """Queues one raw posting; blocks while the pipeline is full."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("IngestPipeline is closed.")
+            if self.error is not None:
+                raise self.error
+            self._producers += 1
+        try:
+            self.items.put(posting, timeout=timeout)
+        finally:
+            with self._lock:
+                self._producers -= 1
+                if not self._producers:
+                    self._idle.notify_all()
+
+    def try_submit(self, posting: dict) -> bool:
+        """Non-blocking submit(); False when the queue is full."""
+        try:
+            self.submit(posting, timeout=0)
+        except queue.Full:
+            return False
+        return True
+
+    def submit_many(self, postings) -> "IngestPipeline":
+        for posting in postings:
+            self.submit(posting)
+        return self
+
+    # ----------------------- STAGES ----------------------- #
+    def _clean_stage(self):
+        batch, deadline = [], None
+        while True:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self.items.get(timeout=timeout)
+            except queue.Empty:
+                item = None  # flush interval elapsed
+            if item is _STOP:
+                break
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_seconds
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._hand_over(batch)
+                batch, deadline = [], None
+        if batch:
+            self._hand_over(batch)
+        self.batches.put(_STOP)
+
+    def _hand_over(self, batch: list[dict]):
+        self.received += len(batch)
+        METRICS.observe("ingest_queue_depth", self.items.qsize(), (0, 10, 100, 1000, 10000))
+        try:
+            # Queued as slotted JobPostings, like inside save_postings
+            self.batches.put(self.db.cleaning.clean_batch(batch, into=JobPosting.from_dict))
+        except Exception as e:
+            self._fail(e, len(batch))
+
+    def _write_stage(self):
+        while True:
+            batch = self.batches.get()
+            if batch is _STOP:
+                break
+            try:
+                with METRICS.timer("ingest_write"):
+                    self.inserted += len(self.db.save_postings(batch, cleaned=True) or [])
+            except Exception as e:
+                self._fail(e, len(batch))
+
+    def _fail(self, error: Exception, size: int):
+        # Keep draining so producers never block forever; the first error is re-raised
+        METRICS.inc("ingest_failed_postings", size)
+        logging.error(f"[INGEST] Batch of {size} postings failed: {error}")
+        if self.error is None:
+            self.error = error
+
+    # ----------------------- SHUTDOWN ----------------------- #
+    def close(self, raise_errors: bool = True):
+        """Flushes in-flight batches and stops the stages; safe to call twice."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            # A producer blocked in put() still gets its item in ahead of _STOP
+            while self._producers:
+                self._idle.wait()
+        self.items.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        atexit.unregister(self.close)
+        logging.info(f"[INGEST] {self.inserted} of {self.received} postings were new.")
+        if raise_errors and self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(raise_errors=exc_type is None)
@@ -1,10 +1,31 @@
-import matplotlib.pyplot as plt
-from database import MongoDBManager, HTMLCleaner, EmojiCleaner, StopwordCleaner, IDatabase, MONGODB_URI, MONGODB_DB, MONGODB_COLLECTION
-import re
+"""
+Command line entry point.
+
+    python main.py                    demo: save the sample postings, print and plot them
+    python main.py crawl [START_URL]  crawl kariyer.net into the configured backend
+    python main.py ingest FILE...     load JSON-lines postings (e.g. from corpus.py), "-" = stdin
+    python main.py export FILE        postings to a compressed .arrow / .parquet file
+    python main.py import FILE        postings back from such a file
+    python main.py analyze            skill counts as JSON (--file FILE: from an export)
+    python main.py report             top skills / skill trend, optionally plotted
+    python main.py bench [ARGS...]    benchmark suite, see bench.py
+
+Heavy modules (matplotlib, pymongo, scrapy, numpy) are imported only by the
+subcommands that use them, and the database is opened on first use.
+"""
+import argparse
+import json
 import logging
 import os
+import sys
 from dotenv import load_dotenv
 
+from database import (
+    BACKENDS, DB_BACKEND, FULL_CLEANING, MONGODB_COLLECTION, MONGODB_DB, MONGODB_URI,
+    InMemoryDBManager, get_database,
+)
+from metrics import profiled, report
+
 # Load environment variables
 load_dotenv()
 
@@ -13,41 +34,10 @@ logging.basicConfig(
     format="%(asctime)s [%(levelname)s] %(message)s"
 )
 
-class MongoDBManagerWithCleaning(MongoDBManager):
-    """Extends MongoDBManager to include data cleaning before saving."""
-
-    def __init__(self, uri=None, db=None, collection=None):
-        super().__init__(uri, db, collection)
-        self.html_cleaner = HTMLCleaner()
-        self.emoji_cleaner = EmojiCleaner()
-        self.stopword_cleaner = StopwordCleaner()
-
-    def clean_posting(self, posting: dict) -> dict:
-        """Cleans the fields of a job posting."""
-        posting['job_title'] = self.stopword_cleaner.clean(
-            self.emoji_cleaner.clean(
-                self.html_cleaner.clean(posting.get('job_title', ''))
-            )
-        )
-        posting['company_name'] = self.stopword_cleaner.clean(
-            self.emoji_cleaner.clean(
-                self.html_cleaner.clean(posting.get('company_name', ''))
-            )
-        )
-        posting['summary_description'] = self.stopword_cleaner.clean(
-            self.emoji_cleaner.clean(
-                self.html_cleaner.clean(posting.get('summary_description', ''))
-            )
-        )
-        return posting
-
-    def save_postings(self, postings: list[dict]):
-        """Cleans and saves multiple postings into the database."""
-        cleaned_postings = [self.clean_posting(posting) for posting in postings]
-        super().save_postings(cleaned_postings)
-
 def plot_skill_distribution(skill_counts: dict):
     """Plots a bar chart of skill distribution."""
+    import matplotlib.pyplot as plt
+
     skills = list(skill_counts.keys())
     counts = list(skill_counts.values())
 
@@ -61,73 +51,64 @@ def plot_skill_distribution(skill_counts: dict):
     plt.show()
 
 
-def print_postings(postings: list[dict], title: str = "Job Postings"):
-    """Prints postings in a readable format."""
+def print_postings(postings, title: str = "Job Postings") -> int:
+    """Prints postings (any iterable) in a readable format and returns how many were printed."""
     print(f"\n{'='*80}")
     print(f"{title.upper()}")
     print(f"{'='*80}\n")
     
+    count = 0
     for i, posting in enumerate(postings, 1):
+        count = i
         print(f" Posting #{i}")
         print(f"   Job Title: {posting.get('job_title', 'N/A')}")
         print(f"   Company: {posting.get('company_name', 'N/A')}")
         print(f"   Description: {posting.get('summary_description', 'N/A')[:100]}...")
         print(f"   Link: {posting.get('ad_link', 'N/A')}")
         print(f"   {'-'*76}\n")
+    return count
 
 
-def main():
-    """Main entry point for the application."""
+class LazyDatabase:
+    """
+    Stands in for an IDatabase and opens the backend on first attribute
+    access, so subcommands that never touch the database never connect.
+    With fallback=True an unreachable backend is replaced by InMemoryDBManager.
+    """
+
+    def __init__(self, backend: str = DB_BACKEND, fallback: bool = False, **kwargs):
+        self.backend = backend
+        self.fallback = fallback
+        self.kwargs = kwargs
+        self._db = None
+
+    def _open(self):
+        if self._db is None:
+            try:
+                self._db = get_database(self.backend, **self.kwargs)
+            except Exception as e:
+                if not self.fallback:
+                    raise
+                logging.warning(f"Backend '{self.backend}' unavailable, using in-memory DB fallback: {e}")
+                self._db = InMemoryDBManager(**self.kwargs)
+        return self._db
+
+    def __getattr__(self, name):
+        return getattr(self._open(), name)
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+
+
+# -------------------------------------------------------
+# SUBCOMMANDS
+# -------------------------------------------------------
+def cmd_demo(db_manager, args=None):
+    """The original walkthrough: save the sample postings, print and plot them."""
     logging.info("Starting Job Scraper Application...")
-    logging.info(f"MongoDB Config - URI: {MONGODB_URI}, DB: {MONGODB_DB}, Collection: {MONGODB_COLLECTION}")
-    
-    # Initialize the database manager with cleaning (try MongoDB, fallback to in-memory)
-    try:
-        db_manager = MongoDBManagerWithCleaning()
-    except Exception as e:
-        logging.warning(f"MongoDB unavailable, using in-memory DB fallback: {e}")
-
-        class InMemoryDBManager:
-            """Simple in-memory DB replacement used when MongoDB is unreachable."""
-
-            def __init__(self):
-                self.html_cleaner = HTMLCleaner()
-                self.emoji_cleaner = EmojiCleaner()
-                self.stopword_cleaner = StopwordCleaner()
-                self._store: list[dict] = []
-
-            def clean_posting(self, posting: dict) -> dict:
-                p = posting.copy()
-                p['job_title'] = self.stopword_cleaner.clean(
-                    self.emoji_cleaner.clean(
-                        self.html_cleaner.clean(p.get('job_title', ''))
-                    )
-                )
-                p['company_name'] = self.stopword_cleaner.clean(
-                    self.emoji_cleaner.clean(
-                        self.html_cleaner.clean(p.get('company_name', ''))
-                    )
-                )
-                p['summary_description'] = self.stopword_cleaner.clean(
-                    self.emoji_cleaner.clean(
-                        self.html_cleaner.clean(p.get('summary_description', ''))
-                    )
-                )
-                return p
-
-            def save_postings(self, postings: list[dict]):
-                cleaned = [self.clean_posting(p) for p in postings]
-                existing = {p.get('ad_link') for p in self._store}
-                new = [p for p in cleaned if p.get('ad_link') not in existing]
-                self._store.extend(new)
-                logging.info(f"(InMemory) Inserted {len(new)} postings.")
-                return new
-
-            def find_all_postings(self):
-                return list(self._store)
-
-        db_manager = InMemoryDBManager()
-    
+    logging.info(f"Backend: {getattr(db_manager, 'backend', DB_BACKEND)} - MongoDB Config - URI: {MONGODB_URI}, DB: {MONGODB_DB}, Collection: {MONGODB_COLLECTION}")
+
     # Sample job postings for demonstration
     sample_postings = [
         {
@@ -162,34 +143,36 @@ def main():
         print("   Displaying cleaned data in memory instead:\n")
         
         # Display cleaned postings even if DB connection fails
-        cleaned_postings = [db_manager.clean_posting(p) for p in sample_postings]
+        cleaned_postings = db_manager.cleaning.clean_batch(sample_postings)
         print_postings(cleaned_postings, "Cleaned Postings (In Memory)")
         return
     
-    # Retrieve and display postings
+    # Retrieve and display postings (streamed, never held as one list)
     try:
-        postings = db_manager.find_all_postings()
-        if postings:
-            print_postings(postings, "Cleaned Postings from Database")
-            logging.info(f"Retrieved {len(postings)} postings from database.")
+        shown = print_postings(db_manager.iter_postings(), "Cleaned Postings from Database")
+        if shown:
+            logging.info(f"Retrieved {shown} postings from database.")
         else:
             logging.warning("No postings found in database.")
     except Exception as e:
         logging.error(f"Error retrieving postings: {e}")
-        postings = []
     
     logging.info("Job Scraper Application finished.")
     
-    # A simple counting logic to plot the graph
-    if not postings:
-        postings = []
-    
-    all_text = " ".join([p.get('summary_description', '') + " " + p.get('job_title', '') for p in postings])
-    
-    # Sample skill set
+    # Postings per sample skill, from one posting x skill matrix
     # If data exists, draw the graph
     target_skills = ["Python", "Java", "React", "Node.js", "Spring"]
-    skill_counts = {skill: all_text.count(skill) for skill in target_skills}
+    skill_counts = {skill: 0 for skill in target_skills}
+    try:
+        from analysis import SkillKeyword
+        from skill_matrix import SkillMatrix
+
+        keywords = [SkillKeyword(skill.lower(), [], "technical") for skill in target_skills]
+        projection = {"_id": 0, "job_title": 1, "summary_description": 1}
+        matrix = SkillMatrix.from_postings(db_manager.iter_postings(projection), keywords, use_tags=False)
+        skill_counts = dict(zip(target_skills, matrix.skill_totals().tolist()))
+    except Exception as e:
+        logging.error(f"Error counting skills: {e}")
     
     if any(skill_counts.values()):
         logging.info("Grafik oluşturuluyor...")
@@ -198,5 +181,210 @@ def main():
     logging.info("Job Scraper Application finished.")
 
 
+def cmd_crawl(db, args):
+    from crawler import run_crawl
+
+    stats = run_crawl(args.start_url, db=db)
+    logging.info(f"Crawl finished: {stats.get('item_scraped_count', 0)} items scraped.")
+
+
+def _read_json_lines(paths):
+    for path in paths:
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line in stream:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def cmd_ingest(db, args):
+    """Reading, cleaning and saving overlap through ingest.IngestPipeline."""
+    from ingest import IngestPipeline
+
+    if args.synthetic:
+        from corpus import generate_postings
+        postings = generate_postings(args.synthetic, seed=args.seed)
+    else:
+        postings = _read_json_lines(args.files)
+
+    with IngestPipeline(db, batch_size=args.batch_size) as pipeline:
+        pipeline.submit_many(postings)
+
+
+def cmd_export(db, args):
+    from columnar import export_postings
+
+    export_postings(db, args.file, chunk_size=args.chunk_size)
+
+
+def cmd_import(db, args):
+    from columnar import import_postings
+
+    import_postings(db, args.file, chunk_size=args.chunk_size)
+
+
+def cmd_analyze(db, args):
+    """
+    Skill counts as JSON; MongoDB counts server-side ranges, other backends stream.
+    Full counts are served from the report cache until the corpus changes;
+    --matrix keeps a skill matrix on disk instead (see skill_matrix.py).
+    """
+    from analysis import COUNT_PROJECTION, Analyzer
+    from report_cache import REPORT_CACHE, report_key
+
+    cache = None if args.no_cache else REPORT_CACHE
+    if args.file:
+        counts = Analyzer().count_skills_file(args.file)
+    elif args.matrix:
+        from skill_matrix import load_or_build
+
+        counts = load_or_build(db, args.matrix).skill_counts()
+    elif args.backend == "mongodb":
+        analyzer = Analyzer(MONGODB_URI, MONGODB_DB, MONGODB_COLLECTION, cache=cache)
+        if args.incremental or args.rebuild:
+            counts = analyzer.count_skills_incremental(rebuild=args.rebuild)
+        else:
+            counts = analyzer.count_skills(workers=args.workers)
+        analyzer.close()
+    else:
+        analyzer = Analyzer()
+        projection = {**COUNT_PROJECTION, "near_duplicate_of": 1}
+
+        def count():
+            originals = (p for p in db.iter_postings(projection) if not p.get("near_duplicate_of"))
+            return analyzer.count_skills_in(originals)
+
+        if cache is None:
+            counts = count()
+        else:
+            key = report_key("count_skills", analyzer.keywords_fingerprint(), db.corpus_version(),
+                             backend=args.backend)
+            counts = cache.cached(key, count)
+    print(json.dumps(counts, ensure_ascii=False, indent=2))
+
+
+def cmd_report(db, args):
+    """Top skills (or one skill's trend) printed, and plotted with --plot."""
+    if args.trend:
+        from trends import trend
+
+        rows = trend(db, args.trend, args.period, args.last)
+        title = f"{args.trend} per {args.period}"
+    else:
+        if args.matrix:
+            from skill_matrix import load_or_build
+
+            rows = load_or_build(db, args.matrix).top_skills(company=args.company, limit=args.top)
+        else:
+            rows = db.top_skills(company=args.company, limit=args.top)
+        title = f"Top skills{f' at {args.company}' if args.company else ''}"
+
+    print(title)
+    for name, count in rows:
+        print(f"  {name:<24} {count}")
+    if args.plot and rows:
+        plot_skill_distribution(dict(rows))
+
+
+def cmd_bench(db, args):
+    import bench
+
+    bench.main(args.bench_args)
+
+
+# -------------------------------------------------------
+# COMMAND LINE
+# -------------------------------------------------------
+def _positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Kariyer.net job posting scraper and skill analysis.")
+    parser.add_argument("--backend", default=DB_BACKEND, choices=sorted(BACKENDS))
+    sub = parser.add_subparsers(dest="command")
+
+    sub.add_parser("demo", help="save, print and plot the sample postings (default)")
+
+    crawl = sub.add_parser("crawl", help="crawl kariyer.net into the database")
+    crawl.add_argument("start_url", nargs="?")
+
+    ingest = sub.add_parser("ingest", help="load JSON-lines postings")
+    ingest.add_argument("files", nargs="*", default=["-"])
+    ingest.add_argument("--batch-size", type=int, default=1000)
+    ingest.add_argument("--synthetic", type=int, metavar="N", help="generate N postings with corpus.py")
+    ingest.add_argument("--seed", type=int, default=42)
+
+    for name, help_ in (("export", "write postings to a columnar file"),
+                        ("import", "load postings from a columnar file")):
+        columnar = sub.add_parser(name, help=help_)
+        columnar.add_argument("file", help=".arrow (Arrow IPC) or .parquet")
+        columnar.add_argument("--chunk-size", type=int, default=10000)
+
+    analyze = sub.add_parser("analyze", help="print skill counts as JSON")
+    analyze.add_argument("--file", help="count from a columnar export instead of the database")
+    analyze.add_argument("--workers", type=int, default=1)
+    analyze.add_argument("--incremental", action="store_true")
+    analyze.add_argument("--rebuild", action="store_true")
+    analyze.add_argument("--no-cache", action="store_true", help="always rescan, see report_cache.py")
+    analyze.add_argument("--matrix", metavar="FILE",
+                         help="count from a saved .npz skill matrix, rebuilt when the corpus changed")
+
+    report_ = sub.add_parser("report", help="top skills or a skill trend")
+    report_.add_argument("--top", type=int, default=10)
+    report_.add_argument("--company")
+    report_.add_argument("--trend", metavar="SKILL")
+    report_.add_argument("--period", default="week", choices=["day", "week"])
+    report_.add_argument("--last", type=_positive_int, default=12, help="number of buckets, at least 1")
+    report_.add_argument("--plot", action="store_true")
+    report_.add_argument("--matrix", metavar="FILE", help="top skills from a saved .npz skill matrix")
+
+    bench = sub.add_parser("bench", help="run bench.py with the remaining arguments")
+    bench.add_argument("bench_args", nargs=argparse.REMAINDER)
+    return parser
+
+
+COMMANDS = {
+    None: cmd_demo,
+    "demo": cmd_demo,
+    "crawl": cmd_crawl,
+    "ingest": cmd_ingest,
+    "export": cmd_export,
+    "import": cmd_import,
+    "analyze": cmd_analyze,
+    "report": cmd_report,
+    "bench": cmd_bench,
+}
+
+
+def main(argv=None):
+    """Main entry point for the application."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if (args.command == "analyze" and (args.file or args.matrix or args.backend != "mongodb")
+            and (args.incremental or args.rebuild or args.workers != 1)):
+        parser.error("analyze --incremental, --rebuild and --workers need --backend mongodb "
+                     "(and no --file or --matrix)")
+    if args.command == "analyze" and args.file and args.matrix:
+        parser.error("analyze takes --file or --matrix, not both")
+    if args.command == "report" and args.trend and args.matrix:
+        parser.error("report --trend reads the trend rollups, not --matrix")
+    # Every write command cleans HTML, emoji and stopwords on every field, as the
+    # app's save path always has, so one collection never holds two cleanings
+    db = LazyDatabase(args.backend, fallback=args.command in (None, "demo"), cleaning=FULL_CLEANING)
+    try:
+        COMMANDS[args.command](db, args)
+    finally:
+        db.close()
+
+
 if __name__ == "__main__":
-    main()
+    with profiled():
+        main()
+    report()
@@ -0,0 +1,250 @@
+"""
+Lightweight run metrics for the crawl, clean, dedup, insert and analyze stages.
+
+Stages record timers (a histogram of seconds per call), counters and
+size histograms into one process-wide registry, METRICS. Everything is
+recorded per batch, not per posting, so the overhead stays negligible.
+At the end of a run `report()` emits a summary as JSON or Prometheus
+text, depending on METRICS_FORMAT.
+
+Profiling is switched on from the environment: PROFILE=cprofile writes
+pstats to PROFILE_OUTPUT, PROFILE=sample logs the hottest stacks seen
+by a low-overhead sampling thread.
+"""
+import bisect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# -------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------
+METRICS_FORMAT = os.getenv("METRICS_FORMAT", "json")  # json | prometheus | off
+METRICS_OUTPUT = os.getenv("METRICS_OUTPUT", "")  # file path; empty = log it
+PROFILE = os.getenv("PROFILE", "")  # "" | cprofile | sample
+PROFILE_OUTPUT = os.getenv("PROFILE_OUTPUT", "profile.pstats")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", "0.005"))
+
+PREFIX = "jobs"
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60)
+SIZE_BUCKETS = (1, 10, 50, 100, 500, 1000, 5000, 10000)
+
+
+# -------------------------------------------------------
+# 1. Histogram
+# -------------------------------------------------------
+class Histogram:
+    """Cumulative-bucket histogram with count and sum, Prometheus style."""
+
+    def __init__(self, buckets=SECONDS_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total, result = 0, []
+        for bound, n in zip([*self.buckets, "+Inf"], self.counts):
+            total += n
+            result.append((str(bound), total))
+        return result
+
+
+# -------------------------------------------------------
+# 2. Registry
+# -------------------------------------------------------
+class Metrics:
+    """Counters and histograms keyed by (name, labels); safe to share between threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: dict[tuple, float] = {}
+        self.histograms: dict[tuple, Histogram] = {}
+
+    @staticmethod
+    def _key(name: str, labels: dict) -> tuple:
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, buckets=SECONDS_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, stage: str):
+        """with METRICS.timer("insert"): ... -> stage_seconds{stage="insert"}"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_seconds", time.perf_counter() - start, stage=stage)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    # ----------------------- SUMMARY ----------------------- #
+    def summary(self) -> dict:
+        """{"counters": {...}, "histograms": {...}} with labels rendered inline."""
+        with self._lock:
+            return {
+                "counters": {_series(name, labels): value
+                             for (name, labels), value in sorted(self.counters.items())},
+                "histograms": {
+                    _series(name, labels): {"count": h.count, "sum": round(h.sum, 6),
+                                            "buckets": dict(h.cumulative())}
+                    for (name, labels), h in sorted(self.histograms.items())
+                },
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.summary(), indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f"{PREFIX}_{_series(name, labels)} {value}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                for bound, total in h.cumulative():
+                    lines.append(f"{PREFIX}_{_series(name + '_bucket', labels + (('le', bound),))} {total}")
+                lines.append(f"{PREFIX}_{_series(name + '_sum', labels)} {h.sum:.6f}")
+                lines.append(f"{PREFIX}_{_series(name + '_count', labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _series(name: str, labels: tuple) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+METRICS = Metrics()
+
+
+def report(fmt: str = None, output: str = None):
+    """Emits the end-of-run summary to METRICS_OUTPUT, or to the log."""
+    fmt = fmt or METRICS_FORMAT
+    output = METRICS_OUTPUT if output is None else output
+    if fmt == "off":
+        return
+    text = METRICS.to_prometheus() if fmt == "prometheus" else METRICS.to_json()
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text)
+        logging.info(f"Run metrics written to {output}")
+    else:
+        logging.info(f"Run metrics:\n{text}")
+
+
+# -------------------------------------------------------
+# 3. Aggregated Logging
+# -------------------------------------------------------
+class RateLimitedLog:
+    """
+    Counts repeated events and logs at most one line per `interval` seconds,
+    e.g. "Duplicate skipped: 1523 postings in the last 5s (last: <link>)".
+    """
+
+    def __init__(self, message: str, interval: float = 5.0, level: int = logging.INFO):
+        self.message = message
+        self.interval = interval
+        self.level = level
+        self.pending = 0
+        self.last_detail = None
+        self._last_emit = time.monotonic()
+
+    def hit(self, detail: str = None):
+        self.pending += 1
+        self.last_detail = detail
+        if time.monotonic() - self._last_emit >= self.interval:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            logging.log(self.level, f"{self.message}: {self.pending} in the last "
+                                    f"{time.monotonic() - self._last_emit:.0f}s (last: {self.last_detail})")
+        self.pending = 0
+        self._last_emit = time.monotonic()
+
+
+# -------------------------------------------------------
+# 4. Profiling Hook
+# -------------------------------------------------------
+class _Sampler:
+    """Samples the main thread's stack every `interval` seconds from a daemon thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples = Counter()
+        self._target = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                stack = traceback.extract_stack(frame, limit=8)
+                self.samples[" <- ".join(f"{f.name} ({os.path.basename(f.filename)}:{f.lineno})"
+                                         for f in reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, top: int = 15):
+        self._stop.set()
+        self._thread.join()
+        total = sum(self.samples.values()) or 1
+        lines = [f"{n / total:6.1%}  {stack}" for stack, n in self.samples.most_common(top)]
+        logging.info("Sampling profile (hottest stacks):\n" + "\n".join(lines))
+
+
+@contextmanager
+def profiled(mode: str = None):
+    """Profiles the block when PROFILE (or `mode`) is "cprofile" or "sample"; no-op otherwise."""
+    mode = PROFILE if mode is None else mode
+    if mode == "cprofile":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(PROFILE_OUTPUT)
+            logging.info(f"cProfile stats written to {PROFILE_OUTPUT} (python -m pstats {PROFILE_OUTPUT})")
+    elif mode == "sample":
+        sampler = _Sampler(PROFILE_INTERVAL)
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+    else:
+        yield
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+One pooled MongoClient per URI, shared by ingest, analysis and reporting.
+
+MongoClient is thread-safe and keeps its own connection pool, so every
+MongoDBManager and Analyzer in a process borrows the same client instead of
+opening one each. Clients are reference counted: `acquire()` connects (with
+exponential backoff) the first time a URI is used, `release()` closes the
+client when its last user lets go, and `close_all()` runs at interpreter exit.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from metrics import METRICS
+
+load_dotenv()
+
+# -------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+MONGODB_TIMEOUT_MS = int(os.getenv("MONGODB_TIMEOUT_MS", "1000"))  # server selection + connect
+MONGODB_RETRIES = int(os.getenv("MONGODB_RETRIES", "3"))
+MONGODB_BACKOFF = float(os.getenv("MONGODB_BACKOFF", "0.5"))  # first delay, doubled per attempt
+MONGODB_BACKOFF_MAX = float(os.getenv("MONGODB_BACKOFF_MAX", "8"))
+
+
+def backoff_delays(retries: int = MONGODB_RETRIES, base: float = MONGODB_BACKOFF,
+                   cap: float = MONGODB_BACKOFF_MAX) -> list[float]:
+    """Sleeps between attempts: base, 2*base, 4*base, ... capped at `cap`."""
+    return [min(cap, base * 2 ** i) for i in range(max(retries - 1, 0))]
+
+
+# -------------------------------------------------------
+# 1. Client Registry
+# -------------------------------------------------------
+class ClientRegistry:
+    """Reference-counted MongoClients keyed by URI; safe to share between threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: dict[str, object] = {}
+        self._users: dict[str, int] = {}
+        self._pid = os.getpid()
+
+    def _check_fork(self):
+        # Clients are not fork-safe: a worker process starts with an empty registry
+        if self._pid != os.getpid():
+            self._clients.clear()
+            self._users.clear()
+            self._pid = os.getpid()
+
+    def _connect(self, uri: str):
+        # pymongo is imported on first use, so the other backends and the CLI start without it
+        from pymongo import MongoClient, errors
+
+        delays = backoff_delays()
+        for attempt in range(len(delays) + 1):
+            client = MongoClient(
+                uri,
+                maxPoolSize=MONGODB_MAX_POOL_SIZE,
+                minPoolSize=MONGODB_MIN_POOL_SIZE,
+                serverSelectionTimeoutMS=MONGODB_TIMEOUT_MS,
+                connectTimeoutMS=MONGODB_TIMEOUT_MS,
+            )
+            try:
+                client.admin.command("ping")
+                logging.info("Connected to MongoDB successfully.")
+                return client
+            except errors.ServerSelectionTimeoutError:
+                client.close()
+                METRICS.inc("mongodb_connect_failures")
+                if attempt == len(delays):
+                    break
+                logging.warning(f"MongoDB connection failed. Retrying in {delays[attempt]:.1f}s "
+                                f"({attempt + 1}/{len(delays) + 1})...")
+                time.sleep(delays[attempt])
+
+        logging.error(f"Could not connect to MongoDB after {len(delays) + 1} attempts.")
+        raise ConnectionError("MongoDB is unreachable.")
+
+    def acquire(self, uri: str):
+        """The shared client for `uri`, connected on first use; pair with release()."""
+        with self._lock:
+            self._check_fork()
+            client = self._clients.get(uri)
+            if client is None:
+                client = self._clients[uri] = self._connect(uri)
+            self._users[uri] = self._users.get(uri, 0) + 1
+            return client
+
+    def release(self, uri: str):
+        """Drops one user of `uri`; the last one out closes the client."""
+        with self._lock:
+            self._check_fork()
+            if uri not in self._users:
+                return
+            self._users[uri] -= 1
+            if self._users[uri] <= 0:
+                del self._users[uri]
+                self._clients.pop(uri).close()
+
+    def close_all(self):
+        with self._lock:
+            self._check_fork()
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+            self._users.clear()
+
+
+REGISTRY = ClientRegistry()
+acquire = REGISTRY.acquire
+release = REGISTRY.release
+close_all = REGISTRY.close_all
+atexit.register(close_all)
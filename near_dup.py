@@ -0,0 +1,159 @@
+"""
+Near-duplicate posting detection with MinHash + LSH.
+
+Reposts under a new URL, or an agency copy with a slightly reworded
+description, have different ad_links but almost the same text. Each
+posting gets a MinHash signature of its word shingles; signatures are
+split into bands and hashed into buckets, so a lookup only compares the
+postings that share a bucket instead of the whole corpus.
+"""
+import hashlib
+import logging
+
+import numpy as np
+
+from analysis import SymbolCleaner
+
+# Fields that describe the job itself (company is left out on purpose:
+# agency reposts carry a different company name)
+SIGNATURE_FIELDS = ("job_title", "summary_description")
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def _lsh_params(num_perm: int, threshold: float) -> tuple[int, int]:
+    """(bands, rows) whose S-curve midpoint (1/b)^(1/r) is closest to the threshold."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        midpoint = (1 / bands) ** (1 / rows)
+        score = abs(midpoint - threshold)
+        if best is None or score < best[0]:
+            best = (score, bands, rows)
+    return best[1], best[2]
+
+
+class NearDuplicateDetector:
+    """
+    MinHash/LSH index keyed by ad_link. `mode` says what ingest does with a
+    near-duplicate: "tag" stores it with a near_duplicate_of field, "skip"
+    drops it. Postings with fewer than `min_words` words (e.g. a bare title)
+    are too short to tell a copy from a different ad and are never matched.
+    """
+
+    def __init__(self, threshold: float = 0.8, mode: str = "tag", num_perm: int = 128,
+                 shingle_size: int = 3, seed: int = 1, min_words: int = 6):
+        if mode not in ("tag", "skip"):
+            raise ValueError("mode must be 'tag' or 'skip'")
+        self.threshold = threshold
+        self.mode = mode
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.min_words = max(min_words, shingle_size)
+        self.cleaner = SymbolCleaner()
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self.bands, self.rows = _lsh_params(num_perm, threshold)
+        self._buckets: list[dict[bytes, list[str]]] = [{} for _ in range(self.bands)]
+        self._signatures: dict[str, np.ndarray] = {}
+
+    def __len__(self):
+        return len(self._signatures)
+
+    # ----------------------- SIGNATURES ----------------------- #
+    def _shingles(self, posting: dict) -> set[str]:
+        text = self.cleaner.clean(" ".join(f"{posting.get(f) or ''}" for f in SIGNATURE_FIELDS))
+        words = text.split()
+        if len(words) < self.min_words:
+            return set()
+        k = self.shingle_size
+        return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+    def signature(self, posting: dict):
+        """
+        128 (num_perm) minimum hashes of the posting's shingles, vectorized;
+        None when the posting is too short to have any.
+        """
+        shingles = self._shingles(posting)
+        if not shingles:
+            return None
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+             for s in shingles),
+            dtype=np.uint64,
+        )
+        # (perms x shingles) universal hashes, minimum per permutation
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    # ----------------------- INDEX ----------------------- #
+    def add(self, key: str, posting: dict = None, signature: np.ndarray = None):
+        signature = self.signature(posting) if signature is None else signature
+        if signature is None:
+            return
+        self._signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def load(self, postings):
+        """Indexes the stored postings once at startup."""
+        for posting in postings:
+            if posting.get("ad_link"):
+                self.add(posting["ad_link"], posting)
+        logging.info(f"Near-duplicate index loaded with {len(self)} postings.")
+        return self
+
+    def query(self, posting: dict, signature: np.ndarray = None):
+        """
+        Returns (ad_link, estimated Jaccard similarity) of the closest stored
+        posting at or above the threshold, or None.
+        """
+        signature = self.signature(posting) if signature is None else signature
+        if signature is None:
+            return None
+        candidates = set()
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+
+        best = None
+        for key in candidates:
+            similarity = float(np.mean(self._signatures[key] == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def filter(self, docs: list[dict]) -> list[dict]:
+        """
+        Ingest step: indexes originals, and tags or drops near-duplicates
+        (also those inside the same batch).
+        """
+        kept = []
+        for doc in docs:
+            if doc.get("near_duplicate_of"):
+                # Already tagged (an imported copy, see columnar.py): keep the tag
+                kept.append(doc)
+                continue
+            signature = self.signature(doc)
+            if signature is None:
+                # Too short to compare: neither indexed nor looked up
+                kept.append(doc)
+                continue
+            match = self.query(doc, signature)
+            if match is None:
+                self.add(doc["ad_link"], signature=signature)
+                kept.append(doc)
+            elif self.mode == "tag":
+                doc["near_duplicate_of"] = match[0]
+                kept.append(doc)
+        skipped = len(docs) - len(kept)
+        if skipped:
+            logging.info(f"Skipped {skipped} near-duplicate postings.")
+        return kept
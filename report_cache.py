@@ -0,0 +1,190 @@
+"""
+Cache for skill reports between crawls.
+
+A report is keyed by what it was computed from: the keyword list
+(Analyzer.keywords_fingerprint) and the corpus version (the store itself,
+its document count and the largest id, see corpus_version() on the backends). Inserting postings or
+changing the keywords therefore produces a new key, and the old entries are
+never read again; they age out through TTL and size-based eviction.
+
+Two tiers: an in-process LRU, and optionally JSON files in REPORT_CACHE_DIR
+that survive across the short cron-driven runs.
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+from metrics import METRICS
+
+load_dotenv()
+
+# -------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------
+REPORT_CACHE_ENTRIES = int(os.getenv("REPORT_CACHE_ENTRIES", "128"))  # 0 = off
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "3600"))  # seconds; 0 = no expiry
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", "")  # empty = memory tier only
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+def report_key(kind: str, keywords_hash: str, corpus_version: str, **params) -> str:
+    """
+    Stable key for one report; `params` are extra arguments that change the
+    result. corpus_version() names the store, so keys never collide across stores.
+    """
+    payload = json.dumps([kind, keywords_hash, corpus_version, params], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# -------------------------------------------------------
+# 1. Report Cache
+# -------------------------------------------------------
+class ReportCache:
+    """
+    LRU of JSON-serialisable reports with TTL, backed by an optional directory.
+    Callers get their own copy of a report, so mutating it never changes the cache.
+    """
+
+    def __init__(self, max_entries: int = REPORT_CACHE_ENTRIES, ttl: float = REPORT_CACHE_TTL,
+                 directory: str = REPORT_CACHE_DIR, max_bytes: int = REPORT_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # key -> (created, value), least recently used first
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _expired(self, created: float) -> bool:
+        return bool(self.ttl) and time.time() - created > self.ttl
+
+    # ----------------------- MEMORY TIER ----------------------- #
+    def _get_memory(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._expired(entry[0]):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _put_memory(self, key: str, created: float, value):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (created, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    # ----------------------- DISK TIER ----------------------- #
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _get_disk(self, key: str):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if self._expired(entry["created"]):
+            self._remove(self._path(key))
+            return None
+        return entry["created"], entry["value"]
+
+    def _put_disk(self, key: str, created: float, value):
+        if not self.directory:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"created": created, "value": value}, f, ensure_ascii=False)
+        # Atomic, so a concurrent reader never sees half a file
+        os.replace(tmp, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Drops expired files, then the oldest ones until the directory fits max_bytes."""
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if self._expired(stat.st_mtime):
+                self._remove(path)
+            else:
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    # ----------------------- PUBLIC API ----------------------- #
+    def get(self, key: str):
+        """The cached report, or None."""
+        entry = self._get_memory(key)
+        if entry is not None:
+            METRICS.inc("report_cache_hits", tier="memory")
+            return copy.deepcopy(entry[1])
+        entry = self._get_disk(key)
+        if entry is not None:
+            METRICS.inc("report_cache_hits", tier="disk")
+            self._put_memory(key, entry[0], copy.deepcopy(entry[1]))
+            return entry[1]
+        METRICS.inc("report_cache_misses")
+        return None
+
+    def put(self, key: str, value):
+        created = time.time()
+        self._put_memory(key, created, copy.deepcopy(value))
+        try:
+            self._put_disk(key, created, value)
+        except OSError as e:
+            logging.warning(f"Could not write report cache entry: {e}")
+
+    def cached(self, key: str, compute):
+        """get(key), or compute() stored under key."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    self._remove(os.path.join(self.directory, name))
+
+
+# Process-wide cache, configured from .env
+REPORT_CACHE = ReportCache()
@@ -0,0 +1,198 @@
+"""
+Vectorized analytics on a posting x skill matrix.
+
+The postings are scanned once into a bit-packed boolean matrix (one row per
+posting, one bit per skill). Counts, category totals, co-occurrence and
+per-company breakdowns are then numpy operations on that matrix, and the
+matrix can be saved to .npz so repeated reports skip the database: see
+load_or_build(), behind `main.py analyze/report --matrix FILE`.
+"""
+import logging
+import os
+
+import numpy as np
+
+from analysis import TEXT_FIELDS, MatchCleaner, SkillKeyword, SkillTagger
+
+# Everything from_postings reads, so nothing else is pulled from the server
+MATRIX_PROJECTION = {"_id": 0, **{f: 1 for f in TEXT_FIELDS}, "skills": 1, "near_duplicate_of": 1}
+
+# Rows unpacked at a time; keeps memory flat for very large matrices
+CHUNK_ROWS = 65536
+
+
+class SkillMatrix:
+    """Bit-packed posting x skill matrix plus the company of every posting."""
+
+    def __init__(self, bits: np.ndarray, keywords: list[SkillKeyword],
+                 company_codes: np.ndarray, companies: list[str], version: str = ""):
+        self.bits = bits
+        self.keywords = list(keywords)
+        self.company_codes = company_codes
+        self.companies = list(companies)
+        # corpus_version() of the store it was built from; "" when unknown
+        self.version = version
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.bits.shape[0], len(self.keywords)
+
+    # ----------------------- BUILD ----------------------- #
+    @classmethod
+    def from_postings(cls, postings, keywords: list[SkillKeyword] = None, use_tags: bool = True):
+        """
+        One pass over an iterable of posting dicts (e.g. db.iter_postings()).
+        Stored `skills` tags are used when present, otherwise the text is
+        matched like Analyzer.count_skills does. Postings tagged with
+        near_duplicate_of are skipped, so copies do not inflate the counts.
+        """
+        # Same keyword source as SkillTagger: explicit list, SKILL_TAXONOMY file, built-ins
+        tagger = SkillTagger(keywords)
+        keywords, matcher = list(tagger.keywords), tagger.matcher
+        cleaner = MatchCleaner()
+        by_name = {kw.name: i for i, kw in enumerate(keywords)}
+
+        packed, rows, cols, codes = [], [], [], []
+        company_index: dict[str, int] = {}
+
+        def pack(first_row: int, count: int):
+            # Densify and pack one chunk of rows, so the full matrix is never unpacked
+            dense = np.zeros((count, len(keywords)), dtype=bool)
+            dense[np.asarray(rows, dtype=np.int64) - first_row, np.asarray(cols, dtype=np.int64)] = True
+            packed.append(np.packbits(dense, axis=1))
+            rows.clear()
+            cols.clear()
+
+        for posting in postings:
+            if posting.get("near_duplicate_of"):
+                continue
+            row = len(codes)
+            if use_tags and posting.get("skills") is not None:
+                found = [by_name[s] for s in posting["skills"] if s in by_name]
+            else:
+                text = cleaner.clean(" ".join(f"{posting.get(f, '')}" for f in TEXT_FIELDS))
+                found = matcher.match(text)
+            rows.extend([row] * len(found))
+            cols.extend(found)
+            company = posting.get("company_name") or ""
+            codes.append(company_index.setdefault(company, len(company_index)))
+            if len(codes) % CHUNK_ROWS == 0:
+                pack(len(codes) - CHUNK_ROWS, CHUNK_ROWS)
+
+        remainder = len(codes) % CHUNK_ROWS
+        if remainder or not packed:
+            pack(len(codes) - remainder, remainder)
+        bits = np.concatenate(packed)
+        return cls(bits, keywords, np.asarray(codes, dtype=np.int32), list(company_index))
+
+    def _chunks(self):
+        """Yields (bool rows, company codes) CHUNK_ROWS at a time."""
+        skills = len(self.keywords)
+        for start in range(0, self.bits.shape[0], CHUNK_ROWS):
+            block = np.unpackbits(self.bits[start:start + CHUNK_ROWS], axis=1, count=skills)
+            yield block.astype(bool), self.company_codes[start:start + CHUNK_ROWS]
+
+    # ----------------------- REPORTS ----------------------- #
+    def skill_totals(self) -> np.ndarray:
+        totals = np.zeros(len(self.keywords), dtype=np.int64)
+        for block, _ in self._chunks():
+            totals += block.sum(axis=0)
+        return totals
+
+    def skill_counts(self) -> dict:
+        """Same dictionary as Analyzer.count_skills()."""
+        totals = self.skill_totals()
+        results = {kw.name: int(n) for kw, n in zip(self.keywords, totals)}
+        results["category_counts"] = self.category_totals(totals)
+        return results
+
+    def category_totals(self, totals: np.ndarray = None) -> dict:
+        totals = self.skill_totals() if totals is None else totals
+        categories = list(dict.fromkeys(["technical", "soft", *(kw.category for kw in self.keywords)]))
+        # skills x categories one-hot, so one matrix product sums per category
+        onehot = np.zeros((len(self.keywords), len(categories)), dtype=np.int64)
+        for i, kw in enumerate(self.keywords):
+            onehot[i, categories.index(kw.category)] = 1
+        return {c: int(n) for c, n in zip(categories, totals @ onehot)}
+
+    def cooccurrence(self) -> np.ndarray:
+        """skills x skills matrix; [i, j] = postings that mention both i and j."""
+        k = len(self.keywords)
+        result = np.zeros((k, k), dtype=np.int64)
+        for block, _ in self._chunks():
+            as_int = block.astype(np.int32)
+            result += as_int.T @ as_int
+        return result
+
+    def top_skills(self, company=None, limit=10) -> list[tuple[str, int]]:
+        """Same list as IDatabase.top_skills, without touching the database."""
+        if company is None:
+            totals = self.skill_totals()
+        else:
+            totals = np.zeros(len(self.keywords), dtype=np.int64)
+            if company in self.companies:
+                code = self.companies.index(company)
+                for block, codes in self._chunks():
+                    totals += block[codes == code].sum(axis=0)
+        ranked = sorted((-int(n), kw.name) for kw, n in zip(self.keywords, totals) if n)
+        return [(name, -n) for n, name in ranked[:limit]]
+
+    def company_breakdown(self) -> dict[str, dict[str, int]]:
+        """{company: {skill: postings}} computed with one scatter-add per chunk."""
+        per_company = np.zeros((len(self.companies), len(self.keywords)), dtype=np.int64)
+        for block, codes in self._chunks():
+            np.add.at(per_company, codes, block.astype(np.int64))
+        names = [kw.name for kw in self.keywords]
+        return {
+            company: {name: int(n) for name, n in zip(names, row) if n}
+            for company, row in zip(self.companies, per_company)
+        }
+
+    # ----------------------- PERSISTENCE ----------------------- #
+    def save(self, path: str):
+        np.savez_compressed(
+            path,
+            bits=self.bits,
+            company_codes=self.company_codes,
+            companies=np.asarray(self.companies, dtype=str),
+            version=np.asarray(self.version),
+            keywords=np.asarray(
+                [[kw.name, "|".join(kw.synonyms), kw.category] for kw in self.keywords], dtype=str
+            ),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "SkillMatrix":
+        with np.load(path) as data:
+            keywords = [
+                SkillKeyword(str(name), str(synonyms).split("|") if synonyms else [], str(category))
+                for name, synonyms, category in data["keywords"]
+            ]
+            return cls(data["bits"], keywords, data["company_codes"], [str(c) for c in data["companies"]],
+                       str(data["version"]) if "version" in data else "")
+
+
+def _same_keywords(a: list[SkillKeyword], b: list[SkillKeyword]) -> bool:
+    return [(k.name, list(k.synonyms), k.category) for k in a] == \
+        [(k.name, list(k.synonyms), k.category) for k in b]
+
+
+def load_or_build(db, path: str, keywords: list[SkillKeyword] = None) -> SkillMatrix:
+    """
+    The matrix saved at `path` (.npz) when it was built from db's current
+    corpus with the same keywords; otherwise one scan of db, saved to `path`.
+    """
+    if not path.endswith(".npz"):
+        path += ".npz"  # np.savez adds it anyway
+    version = db.corpus_version()
+    keywords = SkillTagger(keywords).keywords
+    if os.path.exists(path):
+        matrix = SkillMatrix.load(path)
+        if matrix.version == version and _same_keywords(matrix.keywords, keywords):
+            logging.info(f"Using the skill matrix in {path}.")
+            return matrix
+    matrix = SkillMatrix.from_postings(db.iter_postings(MATRIX_PROJECTION), keywords)
+    matrix.version = version
+    matrix.save(path)
+    logging.info(f"Saved a {matrix.shape[0]} x {matrix.shape[1]} skill matrix to {path}.")
+    return matrix
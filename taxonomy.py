@@ -0,0 +1,141 @@
+"""
+Skill taxonomy loaded from a JSON or YAML file.
+
+SKILL_TAXONOMY points at the file; without it the built-in DEFAULT_KEYWORDS
+are used. Two layouts are accepted:
+
+    {"suffixes": ["da", "de", ...], "min_stem_length": 4,
+     "skills": [{"name": "python", "synonyms": ["py"], "category": "technical"}, ...]}
+
+    {"categories": {"technical": {"python": ["py"], "sql": ["sql bilgisi"]},
+                    "soft": {"communication": ["iletişim"]}}}
+
+Terms are cleaned like the texts (see analysis.MatchCleaner: "node.js" meets
+"Node.js", "c++" and "c#" keep their symbols; a warning names terms made only
+of symbols, which can never match), and terms
+of at least min_stem_length characters also match with Turkish suffixes
+attached; "suffixes": [] turns that off. The compiled matcher is built once
+per file version and shared by every Analyzer and SkillTagger in the
+process; the file is re-checked at most every TAXONOMY_CHECK_SECONDS and
+rebuilt only when its mtime or size changed.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+from dotenv import load_dotenv
+
+from analysis import SkillKeyword, SkillMatcher
+
+load_dotenv()
+
+# -------------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------------
+SKILL_TAXONOMY = os.getenv("SKILL_TAXONOMY", "")  # .json / .yaml path; empty = built-in keywords
+TAXONOMY_CHECK_SECONDS = float(os.getenv("TAXONOMY_CHECK_SECONDS", "5"))
+
+# Common Turkish case, possessive and plural endings (both vowel-harmony forms).
+# Left out because, attached to an English term, they spell English words:
+# bare vowels, "la"/"le"/"ca"/"ce" ("sparkle", "rustle") and a bare plural
+# "lar"/"ler" ("sparkler", "rustler"). The plural is only accepted with a case
+# or possessive ending after it ("dockerlarda"); "docker'lar" matches anyway.
+DEFAULT_SUFFIXES = (
+    "da", "de", "ta", "te", "dan", "den", "tan", "ten",
+    "ya", "ye", "yi", "yu", "yü",
+    "in", "un", "ün", "nin", "nun", "nün",
+    "yla", "yle", "si", "su", "sü",
+    "lari", "leri", "larda", "lerde", "lardan", "lerden", "larin", "lerin",
+)
+MIN_STEM_LENGTH = 4
+
+
+# -------------------------------------------------------
+# 1. Loading
+# -------------------------------------------------------
+def read_file(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise ImportError("YAML taxonomies need PyYAML (pip install pyyaml).") from e
+            return yaml.safe_load(f) or {}
+        return json.load(f)
+
+
+def parse_taxonomy(data: dict) -> tuple[list[SkillKeyword], tuple, int]:
+    """(keywords, suffixes, min_stem_length) from either file layout."""
+    keywords = [
+        SkillKeyword(entry["name"], list(entry.get("synonyms") or []), entry.get("category", "technical"))
+        for entry in data.get("skills") or []
+    ]
+    for category, skills in (data.get("categories") or {}).items():
+        for name, synonyms in skills.items():
+            keywords.append(SkillKeyword(name, list(synonyms or []), category))
+    if not keywords:
+        raise ValueError("Taxonomy defines no skills.")
+    suffixes = tuple(data.get("suffixes", DEFAULT_SUFFIXES))
+    return keywords, suffixes, int(data.get("min_stem_length", MIN_STEM_LENGTH))
+
+
+# -------------------------------------------------------
+# 2. Hot-Reloading Taxonomy
+# -------------------------------------------------------
+class SkillTaxonomy:
+    """A taxonomy file plus its compiled SkillMatcher, rebuilt when the file changes."""
+
+    def __init__(self, path: str, check_seconds: float = TAXONOMY_CHECK_SECONDS):
+        self.path = path
+        self.check_seconds = check_seconds
+        self._lock = threading.Lock()
+        self._version = None
+        self._checked = 0.0
+        self.keywords: list[SkillKeyword] = []
+        self.matcher: SkillMatcher = None
+        self.current()
+
+    def _stat(self) -> tuple:
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reload(self, version: tuple):
+        keywords, suffixes, min_stem_length = parse_taxonomy(read_file(self.path))
+        self.matcher = SkillMatcher(keywords, suffixes, min_stem_length)
+        self.keywords, self._version = keywords, version
+        logging.info(f"Loaded {len(keywords)} skills from {self.path}.")
+
+    def current(self) -> tuple[list[SkillKeyword], SkillMatcher]:
+        """(keywords, matcher) for the file as it is now."""
+        with self._lock:
+            now = time.monotonic()
+            if self.matcher is None or now - self._checked >= self.check_seconds:
+                self._checked = now
+                try:
+                    version = self._stat()
+                    if version != self._version:
+                        self._reload(version)
+                except (OSError, ValueError, KeyError) as e:
+                    if self.matcher is None:
+                        raise
+                    # Half-written or broken edit: keep serving the last good version
+                    logging.warning(f"Keeping the previous taxonomy, reload of {self.path} failed: {e}")
+            return self.keywords, self.matcher
+
+
+_TAXONOMIES: dict[str, SkillTaxonomy] = {}
+_TAXONOMIES_LOCK = threading.Lock()
+
+
+def get_taxonomy(path: str = None):
+    """The shared SkillTaxonomy for `path` (default SKILL_TAXONOMY), or None when unset."""
+    path = path or SKILL_TAXONOMY
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    with _TAXONOMIES_LOCK:
+        if path not in _TAXONOMIES:
+            _TAXONOMIES[path] = SkillTaxonomy(path)
+        return _TAXONOMIES[path]
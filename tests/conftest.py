@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The modules live in the project root, next to this tests/ directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
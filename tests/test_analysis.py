@@ -0,0 +1,86 @@
+import logging
+
+import mongomock
+import pytest
+
+from analysis import ORIGINALS_ONLY, Analyzer, SkillKeyword, SkillMatcher
+from corpus import generate_postings
+from database import MongoDBManager
+from near_dup import NearDuplicateDetector
+
+
+def analyzer(**kwargs):
+    analyzer = Analyzer(**kwargs)
+    analyzer.taxonomy = None
+    return analyzer
+
+
+def test_stored_tags_are_counted_without_matching_the_text():
+    postings = [
+        # Tagged at ingest: the tags win over the text; names outside the keywords are ignored
+        {"job_title": "Python Developer", "summary_description": "", "skills": ["docker", "kubernetes"]},
+        {"job_title": "Python Developer", "summary_description": "", "skills": []},
+        # Untagged: matched as before
+        {"job_title": "SQL Developer", "summary_description": "iletişim"},
+    ]
+    counts = analyzer().count_skills_in(postings)
+    assert (counts["docker"], counts["python"], counts["sql"], counts["communication"]) == (1, 0, 1, 1)
+    assert counts["category_counts"] == {"technical": 2, "soft": 1}
+
+
+def test_use_tags_false_rematches_every_text():
+    postings = [{"job_title": "Python Developer", "summary_description": "", "skills": ["docker"]}]
+    counts = analyzer(use_tags=False).count_skills_in(postings)
+    assert (counts["python"], counts["docker"]) == (1, 0)
+
+
+@pytest.fixture
+def mongo():
+    client = mongomock.MongoClient()
+    db = MongoDBManager(db="jobs", collection="ads", client=client, near_dup=NearDuplicateDetector(mode="tag"))
+    return db, analyzer(db="jobs", collection="ads", client=client)
+
+
+def test_incremental_counts_equal_a_full_scan_after_each_ingest(mongo, caplog):
+    db, counter = mongo
+    postings = list(generate_postings(300, seed=5))
+    caplog.set_level(logging.INFO)
+
+    db.save_postings(postings[:200])
+    assert counter.count_skills_incremental() == counter.count_skills()
+    assert "Rebuilding" in caplog.text
+    state = counter.state_collection.find_one({"_id": "ads"})
+    assert state["watermark"] == max(d["_id"] for d in db.collection.find(ORIGINALS_ONLY, {"_id": 1}))
+    assert state["keywords_hash"] == counter.keywords_fingerprint()
+
+    caplog.clear()
+    inserted = db.save_postings(postings[200:])
+    originals = [d for d in inserted if not d.get("near_duplicate_of")]
+    assert len(originals) < len(inserted)  # the corpus has near-duplicates
+    assert counter.count_skills_incremental() == counter.count_skills()
+    assert "Rebuilding" not in caplog.text
+    assert f"processed {len(originals)} new postings" in caplog.text
+
+
+def test_tagged_copies_are_not_merged_into_the_totals(mongo):
+    db, counter = mongo
+    db.save_postings(list(generate_postings(50, seed=6)))
+    before = counter.count_skills_incremental()
+    db.collection.insert_one({"job_title": "Python", "skills": ["python"], "ad_link": "https://x/copy",
+                              "near_duplicate_of": "https://x/original"})
+    assert counter.count_skills_incremental() == before
+
+
+def test_changed_keywords_force_a_rebuild(mongo, caplog):
+    db, counter = mongo
+    db.save_postings(list(generate_postings(50, seed=7)))
+    counter.count_skills_incremental()
+
+    counter.keywords = counter.keywords + [SkillKeyword("developer", [], "technical")]
+    counter.matcher = SkillMatcher(counter.keywords)
+    counter.use_tags = False
+    caplog.set_level(logging.INFO)
+    totals = counter.count_skills_incremental()
+    assert "Rebuilding" in caplog.text
+    assert totals == counter.count_skills()
+    assert totals["developer"] > 0
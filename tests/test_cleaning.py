@@ -0,0 +1,48 @@
+import re
+
+import pytest
+
+from corpus import generate_postings
+from database import (
+    DEFAULT_CLEANING, FULL_CLEANING, EmojiCleaner, HTMLCleaner, StopwordCleaner,
+)
+
+FIELDS = ("job_title", "company_name", "summary_description")
+html, emoji, stop = HTMLCleaner(), EmojiCleaner(), StopwordCleaner()
+
+
+def chained_default(posting):
+    """The per-field cleaners MongoDBManager applied one after another."""
+    p = dict(posting)
+    p["job_title"] = stop.clean(html.clean(p.get("job_title", "")))
+    p["company_name"] = html.clean(p.get("company_name", ""))
+    p["summary_description"] = emoji.clean(p.get("summary_description", ""))
+    return p
+
+
+def chained_full(posting):
+    """The original save path: HTML -> emoji -> stopword on every field, then the default cleaning again."""
+    p = dict(posting)
+    for field in FIELDS:
+        p[field] = stop.clean(emoji.clean(html.clean(p.get(field, ""))))
+    return chained_default(p)
+
+
+@pytest.fixture(scope="module")
+def postings():
+    return list(generate_postings(2000, seed=11))
+
+
+@pytest.mark.parametrize("pipeline, chained", [(DEFAULT_CLEANING, chained_default),
+                                               (FULL_CLEANING, chained_full)])
+def test_fused_pipeline_matches_the_chained_cleaners(postings, pipeline, chained):
+    assert pipeline.clean_batch(postings) == [chained(p) for p in postings]
+
+
+def test_full_cleaning_leaves_no_markup_or_emoji(postings):
+    leftover = re.compile(r"<|>|[^\w\s,.!?-]")
+    for cleaned in FULL_CLEANING.clean_batch(postings):
+        for field in FIELDS:
+            assert not leftover.search(cleaned[field]), cleaned[field]
+    assert FULL_CLEANING.clean_batch(FULL_CLEANING.clean_batch(postings[:200])) == \
+        FULL_CLEANING.clean_batch(postings[:200])
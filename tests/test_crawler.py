@@ -0,0 +1,69 @@
+"""
+Crawls of the recorded listing pages in tests/fixtures/listing, served by
+crawler.serve_directory. Each crawl runs in its own interpreter because the
+Twisted reactor cannot be restarted inside one process.
+"""
+import json
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+LISTING = os.path.join(ROOT, "tests", "fixtures", "listing")
+
+CRAWL_SCRIPT = """
+import http.server, json, sys
+from crawler import run_crawl, serve_directory
+
+# Every path the replay server answers, in order
+visited = []
+http.server.SimpleHTTPRequestHandler.log_request = lambda self, *args: visited.append(self.path)
+from database import InMemoryDBManager
+
+listing, known = sys.argv[1], json.loads(sys.argv[2])
+server = serve_directory(listing)
+base = f"http://127.0.0.1:{server.server_port}"
+db = InMemoryDBManager()
+if known:
+    db.save_postings([{"job_title": "x", "company_name": "x", "summary_description": "x",
+                       "ad_link": base + path} for path in known])
+stats = run_crawl(base + "/page1.html", db=db, DOWNLOAD_DELAY=0, HTTPCACHE_ENABLED=False,
+                  LOG_LEVEL="WARNING")
+print(json.dumps({
+    "base": base,
+    "pages": sorted(set(visited)),
+    "responses": stats.get("response_received_count", 0),
+    "links": [p["ad_link"] for p in db.iter_postings() if p["job_title"] != "x"],
+}))
+"""
+
+
+def crawl(known=()):
+    result = subprocess.run(
+        [sys.executable, "-c", CRAWL_SCRIPT, LISTING, json.dumps(list(known))],
+        cwd=ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    out = json.loads(result.stdout.strip().splitlines()[-1])
+    out["links"] = sorted(link.removeprefix(out["base"]) for link in out["links"])
+    return out
+
+
+def test_full_crawl_visits_every_page_and_stores_every_ad():
+    out = crawl()
+    assert out["pages"] == ["/page1.html", "/page2.html", "/page3.html"]
+    assert out["links"] == [f"/is-ilani/{i}" for i in range(1, 7)]
+
+
+def test_recrawl_stops_after_the_first_fully_known_page():
+    # Page 2 holds ads 3 and 4; page 1 is new, so the crawl goes on to page 2 and stops there
+    out = crawl(known=["/is-ilani/3", "/is-ilani/4"])
+    assert out["pages"] == ["/page1.html", "/page2.html"]
+    assert out["links"] == ["/is-ilani/1", "/is-ilani/2"]
+
+
+def test_recrawl_with_a_known_first_page_fetches_nothing_else():
+    out = crawl(known=["/is-ilani/1", "/is-ilani/2"])
+    assert out["pages"] == ["/page1.html"]
+    assert out["links"] == []
@@ -0,0 +1,112 @@
+import mongomock
+import pytest
+
+import database
+from database import InMemoryDBManager, JobPosting, MongoDBManager, SQLiteManager
+from near_dup import NearDuplicateDetector
+from trends import bucket_start, utc_now
+
+DESCRIPTION = (
+    "We are looking for a senior Python developer with strong SQL and Docker "
+    "experience to build data pipelines for our analytics platform"
+)
+
+
+@pytest.fixture(params=["memory", "sqlite", "mongodb"])
+def db(request, tmp_path):
+    near_dup = NearDuplicateDetector(mode="tag")
+    if request.param == "memory":
+        manager = InMemoryDBManager(near_dup=near_dup)
+    elif request.param == "sqlite":
+        manager = SQLiteManager(path=str(tmp_path / "ads.db"), near_dup=near_dup)
+    else:
+        manager = MongoDBManager(db="test_jobs", collection="ads", client=mongomock.MongoClient(),
+                                 near_dup=near_dup)
+    yield manager
+    manager.close()
+
+
+def test_tagged_copies_are_stored_but_not_counted(db):
+    inserted = db.save_postings([
+        {"job_title": "Python Developer", "company_name": "A", "summary_description": DESCRIPTION,
+         "ad_link": "https://example.com/1"},
+        {"job_title": "Python Developer", "company_name": "Agency", "summary_description": DESCRIPTION,
+         "ad_link": "https://example.com/2"},
+    ])
+    assert [p.get("near_duplicate_of") for p in inserted] == [None, "https://example.com/1"]
+    assert len(list(db.iter_postings())) == 2
+
+    assert dict(db.top_skills())["python"] == 1
+    assert db.top_skills(company="Agency") == []
+    assert db.count_with_skills(["python", "sql"]) == 1
+    assert db.count_with_skills([]) == 1
+
+    day = bucket_start(utc_now(), "day").isoformat()
+    assert db.query_rollups("day", "skill", "python", day, day) == {day: 1}
+
+
+def test_read_only_manager_does_not_scan_the_collection(monkeypatch):
+    client = mongomock.MongoClient()
+    client["jobs"]["ads"].insert_one({"ad_link": "https://example.com/1", "skills": ["python"]})
+    monkeypatch.setattr(database, "NEAR_DUP_MODE", "tag")
+    manager = MongoDBManager(db="jobs", collection="ads", client=client)
+
+    scans = []
+    monkeypatch.setattr(manager, "_iter_links", lambda: scans.append("links") or iter(()))
+    monkeypatch.setattr(manager, "iter_postings", lambda *a, **k: scans.append("postings") or iter(()))
+
+    assert manager.top_skills() == [("python", 1)]
+    assert manager.count_with_skills(["python"]) == 1
+    assert scans == []
+
+
+def test_first_save_builds_the_indexes(tmp_path):
+    db = SQLiteManager(path=str(tmp_path / "ads.db"))
+    db.save_postings([{"job_title": "Python", "company_name": "A", "summary_description": "",
+                       "ad_link": "https://example.com/1"}])
+    reopened = SQLiteManager(path=str(tmp_path / "ads.db"))
+    assert reopened._dedup_index is None
+    assert reopened.save_postings([{"job_title": "Python", "company_name": "A",
+                                    "summary_description": "", "ad_link": "https://example.com/1"}]) == []
+    assert len(reopened.dedup_index) == 1
+    db.close()
+    reopened.close()
+
+
+def test_columnar_round_trip_keeps_copies_tagged(db, tmp_path):
+    from columnar import export_postings, import_postings
+
+    # Tagged by a looser detector than the target's, so the target would not re-tag it
+    source = InMemoryDBManager(near_dup=NearDuplicateDetector(threshold=0.5, mode="tag"))
+    source.save_postings([
+        {"job_title": "Python Developer", "company_name": "A", "summary_description": DESCRIPTION,
+         "ad_link": "https://example.com/1"},
+        {"job_title": "Python Developer", "company_name": "Agency",
+         "summary_description": DESCRIPTION + " in Istanbul, hybrid work, private health insurance, "
+                                              "meal card and yearly training budget for every engineer",
+         "ad_link": "https://example.com/2"},
+    ])
+    path = str(tmp_path / "ads.arrow")
+    assert export_postings(source, path) == 2
+
+    assert import_postings(db, path) == 2
+    stored = {p["ad_link"]: p for p in db.iter_postings()}
+    assert stored["https://example.com/1"].get("near_duplicate_of") is None
+    assert stored["https://example.com/2"]["near_duplicate_of"] == "https://example.com/1"
+    assert db.count_with_skills(["python"]) == 1
+
+
+def test_save_batches_carry_slotted_postings_until_write(db, monkeypatch):
+    seen = []
+    tag_posting = db.tagger.tag_posting
+    monkeypatch.setattr(db.tagger, "tag_posting", lambda p: seen.append(type(p)) or tag_posting(p))
+
+    inserted = db.save_postings([
+        {"job_title": "<b>Python</b> Developer", "company_name": "A", "summary_description": DESCRIPTION,
+         "ad_link": "https://example.com/1", "salary": "not stored"},
+    ])
+    assert seen == [JobPosting]
+    assert not hasattr(JobPosting("", "", "", ""), "__dict__")
+    [doc] = inserted
+    assert isinstance(doc, dict) and doc["skills"] == ["python", "sql", "docker"]
+    assert "salary" not in doc
@@ -0,0 +1,36 @@
+from dedup import BloomFilter, LinkIndex
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    links = [f"https://www.kariyer.net/is-ilani/{i}" for i in range(5000)]
+    for link in links:
+        bloom.add(link)
+    assert all(link in bloom for link in links)
+
+
+def test_bloom_filter_false_positive_rate_stays_near_target():
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    for i in range(5000):
+        bloom.add(f"known/{i}")
+    false_positives = sum(f"unknown/{i}" in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.03
+
+
+def test_bloom_index_confirms_maybe_hits_against_the_store():
+    stored = {"a", "b"}
+    checked = []
+
+    def existing_in_store(candidates):
+        checked.extend(candidates)
+        return {c for c in candidates if c in stored}
+
+    index = LinkIndex(bloom=True, capacity=100).load(stored)
+    assert index.filter_new(["a", "b", "c"], existing_in_store) == {"c"}
+    # Only the filter's "maybe" answers reach the store
+    assert set(checked) <= {"a", "b", "c"} and {"a", "b"} <= set(checked)
+
+
+def test_exact_index_never_asks_the_store():
+    index = LinkIndex(bloom=False).load(["a"])
+    assert index.filter_new(["a", "b"], lambda links: 1 / 0) == {"b"}
@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+from database import InMemoryDBManager
+from ingest import IngestPipeline
+
+
+def posting(i):
+    return {"job_title": f"Python Developer {i}", "company_name": "A",
+            "summary_description": "", "ad_link": f"https://example.com/{i}"}
+
+
+class FailingDB(InMemoryDBManager):
+    def save_postings(self, postings, cleaned=False):
+        raise ValueError("database is down")
+
+
+def test_close_writes_everything_still_in_flight():
+    db = InMemoryDBManager()
+    pipeline = IngestPipeline(db, batch_size=100, flush_seconds=60)
+    pipeline.submit_many(posting(i) for i in range(250))
+    pipeline.close()
+    assert len(list(db.iter_postings())) == 250
+    assert (pipeline.received, pipeline.inserted) == (250, 250)
+
+
+def test_item_of_a_producer_inside_submit_during_close_is_not_lost():
+    db = InMemoryDBManager()
+    pipeline = IngestPipeline(db, batch_size=100, flush_seconds=60)
+    entered, go = threading.Event(), threading.Event()
+    put = pipeline.items.put
+
+    def slow_put(item, timeout=None):
+        # Hold the producer between the closed check and the actual put
+        entered.set()
+        go.wait()
+        put(item, timeout=timeout)
+
+    pipeline.items.put = slow_put
+    producer = threading.Thread(target=pipeline.submit, args=(posting(1),))
+    producer.start()
+    entered.wait()
+    pipeline.items.put = put
+    closer = threading.Thread(target=pipeline.close)
+    closer.start()
+    time.sleep(0.05)
+    go.set()
+    producer.join()
+    closer.join()
+
+    assert [p["ad_link"] for p in db.iter_postings()] == ["https://example.com/1"]
+
+
+def test_batches_are_flushed_after_flush_seconds():
+    db = InMemoryDBManager()
+    with IngestPipeline(db, batch_size=100, flush_seconds=0.05) as pipeline:
+        pipeline.submit(posting(1))
+        deadline = time.monotonic() + 2
+        while not list(db.iter_postings()) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(list(db.iter_postings())) == 1
+
+
+def test_write_errors_are_raised_on_close_and_on_submit():
+    pipeline = IngestPipeline(FailingDB(), batch_size=2, flush_seconds=60)
+    pipeline.submit_many([posting(1), posting(2)])
+    deadline = time.monotonic() + 2
+    while pipeline.error is None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with pytest.raises(ValueError):
+        pipeline.submit(posting(3))
+    with pytest.raises(ValueError, match="database is down"):
+        pipeline.close()
+    with pytest.raises(RuntimeError):
+        pipeline.submit(posting(4))
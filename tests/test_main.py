@@ -0,0 +1,36 @@
+import json
+
+import pytest
+
+import database
+import main
+from database import SQLiteManager
+
+
+def test_ingest_stores_fully_cleaned_text(tmp_path, monkeypatch):
+    path = str(tmp_path / "ads.db")
+    monkeypatch.setattr(database, "SQLITE_PATH", path)
+    lines = tmp_path / "postings.jsonl"
+    lines.write_text(json.dumps({
+        "job_title": "<b>Python Developer</b> 🔥",
+        "company_name": "Tech Corp 🚀",
+        "summary_description": "<p>Python'da en az 3 yıl deneyim</p>",
+        "ad_link": "https://example.com/1",
+    }) + "\n", encoding="utf-8")
+
+    main.main(["--backend", "sqlite", "ingest", str(lines)])
+
+    db = SQLiteManager(path=path)
+    [stored] = db.iter_postings()
+    assert stored["job_title"] == "Python Developer"
+    assert stored["company_name"] == "Tech Corp"
+    assert stored["summary_description"] == "Pythonda en az 3 yıl deneyim"
+    assert stored["skills"] == ["python"]
+    db.close()
+
+
+@pytest.mark.parametrize("flags", [["--incremental"], ["--rebuild"], ["--workers", "4"]])
+def test_mongodb_only_analyze_flags_are_rejected_elsewhere(flags, capsys):
+    with pytest.raises(SystemExit):
+        main.main(["--backend", "sqlite", "analyze", *flags])
+    assert "need --backend mongodb" in capsys.readouterr().err
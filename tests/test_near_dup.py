@@ -0,0 +1,43 @@
+from near_dup import NearDuplicateDetector
+
+DESCRIPTION = (
+    "We are looking for a senior Python developer with strong SQL and Docker "
+    "experience to build data pipelines for our analytics platform in Istanbul"
+)
+
+
+def posting(link, title="Senior Python Developer", description=DESCRIPTION):
+    return {"ad_link": link, "job_title": title, "summary_description": description}
+
+
+def test_reworded_copy_is_a_hit():
+    detector = NearDuplicateDetector(threshold=0.7)
+    detector.add("a", posting("a"))
+    copy = posting("b", description=DESCRIPTION.replace("Istanbul", "İstanbul office"))
+    link, similarity = detector.query(copy)
+    assert link == "a" and similarity >= 0.7
+
+
+def test_different_ad_is_a_miss():
+    detector = NearDuplicateDetector()
+    detector.add("a", posting("a"))
+    other = posting("b", "Java Developer", "Spring Boot microservices, Kafka, Kubernetes and "
+                                           "on-call rotation for a payments team in Ankara")
+    assert detector.query(other) is None
+
+
+def test_postings_without_text_are_never_matched():
+    detector = NearDuplicateDetector()
+    blank = [posting(str(i), title="", description="") for i in range(3)]
+    short = [posting(f"s{i}", title="Developer", description=None) for i in range(3)]
+    kept = detector.filter(blank + short)
+    assert kept == blank + short
+    assert not any("near_duplicate_of" in p for p in kept)
+    assert len(detector) == 0
+
+
+def test_tag_mode_keeps_the_copy_and_skip_mode_drops_it():
+    docs = [posting("a"), posting("b")]
+    tagged = NearDuplicateDetector(mode="tag").filter([dict(d) for d in docs])
+    assert [d.get("near_duplicate_of") for d in tagged] == [None, "a"]
+    assert NearDuplicateDetector(mode="skip").filter([dict(d) for d in docs]) == [docs[0]]
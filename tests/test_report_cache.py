@@ -0,0 +1,91 @@
+import report_cache
+from analysis import Analyzer, SkillKeyword
+from database import InMemoryDBManager, SQLiteManager
+from report_cache import ReportCache, report_key
+
+
+def posting(i):
+    return {"job_title": "Python Developer", "company_name": "A",
+            "summary_description": f"posting number {i}", "ad_link": f"https://example.com/{i}"}
+
+
+def test_new_postings_invalidate_the_cached_report(tmp_path):
+    cache = ReportCache(directory="")
+    analyzer = Analyzer()
+    analyzer.taxonomy = None
+    calls = []
+
+    for db in (InMemoryDBManager(), SQLiteManager(path=str(tmp_path / "ads.db"))):
+        def report():
+            key = report_key("count_skills", analyzer.keywords_fingerprint(), db.corpus_version())
+            return cache.cached(key, lambda: calls.append(1) or analyzer.count_skills_in(db.iter_postings()))
+
+        db.save_postings([posting(1)])
+        assert report()["python"] == 1
+        assert report()["python"] == 1
+        db.save_postings([posting(2)])
+        assert report()["python"] == 2
+        db.close()
+
+    assert len(calls) == 4
+
+
+def test_changed_keywords_invalidate_the_cached_report():
+    analyzer = Analyzer()
+    analyzer.taxonomy = None
+    before = analyzer.keywords_fingerprint()
+    analyzer.keywords = analyzer.keywords + [SkillKeyword("rust", [], "technical")]
+    assert report_key("count_skills", before, "1:1") != \
+        report_key("count_skills", analyzer.keywords_fingerprint(), "1:1")
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ReportCache(max_entries=2, directory="")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+
+def test_entries_expire_after_ttl(monkeypatch, tmp_path):
+    now = [1000.0]
+    monkeypatch.setattr(report_cache.time, "time", lambda: now[0])
+    cache = ReportCache(ttl=60, directory=str(tmp_path))
+    cache.put("a", {"python": 1})
+    now[0] += 59
+    assert cache.get("a") == {"python": 1}
+    now[0] += 2
+    assert cache.get("a") is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_disk_tier_outlives_the_process_cache(tmp_path):
+    ReportCache(directory=str(tmp_path)).put("a", {"python": 1})
+    assert ReportCache(directory=str(tmp_path)).get("a") == {"python": 1}
+
+
+def test_disk_tier_is_kept_under_max_bytes(tmp_path):
+    cache = ReportCache(directory=str(tmp_path), max_bytes=200)
+    for key in "abcdef":
+        cache.put(key, "x" * 50)
+    assert sum(f.stat().st_size for f in tmp_path.iterdir()) <= 200
+
+
+def test_two_stores_with_the_same_row_count_never_share_a_key(tmp_path):
+    a, b = SQLiteManager(path=str(tmp_path / "a.db")), SQLiteManager(path=str(tmp_path / "b.db"))
+    a.save_postings([posting(1)])
+    b.save_postings([posting(2)])
+    assert a.corpus_version() != b.corpus_version()
+    assert InMemoryDBManager().corpus_version() != InMemoryDBManager().corpus_version()
+    a.close()
+    b.close()
+
+
+def test_callers_cannot_mutate_the_cached_report(tmp_path):
+    cache = ReportCache(directory=str(tmp_path))
+    report = cache.cached("a", lambda: {"python": 1, "category_counts": {"technical": 1}})
+    report.pop("category_counts")
+    cache.get("a")["python"] = 99
+    assert cache.get("a") == {"python": 1, "category_counts": {"technical": 1}}
+    assert ReportCache(directory=str(tmp_path)).get("a") == {"python": 1, "category_counts": {"technical": 1}}
@@ -0,0 +1,51 @@
+import random
+import re
+
+from analysis import DEFAULT_KEYWORDS, SkillKeyword, SkillMatcher, SkillTagger, SymbolCleaner
+
+KEYWORDS = DEFAULT_KEYWORDS + [
+    SkillKeyword("sql server", ["mssql"], "technical"),
+    SkillKeyword("java", ["jvm"], "technical"),
+    SkillKeyword("spring boot", ["spring"], "technical"),
+    SkillKeyword("team leadership", ["team lead"], "soft"),
+]
+FILLER = ["developer", "deneyim", "yazılım", "server", "boot", "script", "lead", "pythonic", "x"]
+
+
+def naive_match(keywords, text):
+    """The original per-keyword, per-synonym re.search loop."""
+    return {
+        idx for idx, kw in enumerate(keywords)
+        if any(re.search(rf"\b{re.escape(term)}\b", text) for term in [kw.name, *kw.synonyms])
+    }
+
+
+def test_trie_matcher_agrees_with_the_naive_loop():
+    rng = random.Random(7)
+    cleaner = SymbolCleaner()
+    matcher = SkillMatcher(KEYWORDS)
+    terms = [t for kw in KEYWORDS for t in [kw.name, *kw.synonyms]]
+    for _ in range(2000):
+        words = rng.choices(FILLER, k=rng.randint(0, 12)) + rng.choices(terms, k=rng.randint(0, 4))
+        rng.shuffle(words)
+        text = cleaner.clean(" ".join(words))
+        assert matcher.match(text) == naive_match(KEYWORDS, text), text
+
+
+def test_overlapping_terms_are_all_found():
+    matcher = SkillMatcher(KEYWORDS)
+    assert matcher.match_names("sql server and spring boot") == {"sql", "sql server", "spring boot"}
+
+
+def test_empty_keyword_list_matches_nothing():
+    assert SkillMatcher([]).match("python sql") == set()
+
+
+def test_dotted_and_dotless_i_are_folded_only_for_matching():
+    tagger = SkillTagger()
+    for text in ("İLETİŞİM becerisi", "ILETIŞIM becerisi", "iletişim becerisi"):
+        skills, _ = tagger.tag({"summary_description": text})
+        assert skills == ["communication"]
+    # Stored-text and near-duplicate cleaning is unchanged
+    assert SymbolCleaner().clean("ILETISIM") == "iletisim"
+    assert SymbolCleaner().clean("DIŞ") == "diş"
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+import main
+from analysis import Analyzer
+from corpus import generate_postings
+from database import FULL_CLEANING, InMemoryDBManager
+from skill_matrix import SkillMatrix, load_or_build
+
+
+@pytest.fixture(scope="module")
+def db():
+    db = InMemoryDBManager(cleaning=FULL_CLEANING)
+    db.save_postings(list(generate_postings(500, seed=3)))
+    return db
+
+
+@pytest.mark.parametrize("use_tags", [True, False])
+def test_skill_counts_equal_the_analyzer(db, use_tags):
+    analyzer = Analyzer()
+    analyzer.taxonomy = None
+    expected = analyzer.count_skills_in(db.iter_postings())
+    assert SkillMatrix.from_postings(db.iter_postings(), use_tags=use_tags).skill_counts() == expected
+
+
+def test_save_load_round_trip(db, tmp_path):
+    matrix = SkillMatrix.from_postings(db.iter_postings())
+    matrix.save(str(tmp_path / "skills.npz"))
+    loaded = SkillMatrix.load(str(tmp_path / "skills.npz"))
+    assert loaded.skill_counts() == matrix.skill_counts()
+    assert np.array_equal(loaded.cooccurrence(), matrix.cooccurrence())
+    assert loaded.company_breakdown() == matrix.company_breakdown()
+
+
+def test_top_skills_match_the_database(db):
+    matrix = SkillMatrix.from_postings(db.iter_postings())
+    assert matrix.top_skills(limit=3) == db.top_skills(limit=3)
+    company = next(db.iter_postings())["company_name"]
+    assert matrix.top_skills(company=company) == db.top_skills(company=company)
+
+
+def test_saved_matrix_is_reused_until_the_corpus_changes(tmp_path, monkeypatch):
+    db = InMemoryDBManager()
+    db.save_postings(list(generate_postings(50, seed=1)))
+    path = str(tmp_path / "skills.npz")
+    first = load_or_build(db, path)
+
+    scans = []
+    iter_postings = db.iter_postings
+    monkeypatch.setattr(db, "iter_postings", lambda *a, **k: scans.append(1) or iter_postings(*a, **k))
+    assert load_or_build(db, path).skill_counts() == first.skill_counts()
+    assert scans == []
+
+    db.save_postings(list(generate_postings(60, seed=2))[50:])
+    rebuilt = load_or_build(db, path)
+    assert scans == [1]
+    assert rebuilt.shape[0] > first.shape[0]
+
+
+def test_analyze_and_report_read_the_matrix(tmp_path, monkeypatch, capsys):
+    import database
+
+    monkeypatch.setattr(database, "SQLITE_PATH", str(tmp_path / "ads.db"))
+    path = str(tmp_path / "skills.npz")
+    main.main(["--backend", "sqlite", "ingest", "--synthetic", "100"])
+    capsys.readouterr()
+
+    main.main(["--backend", "sqlite", "analyze", "--no-cache"])
+    expected = capsys.readouterr().out
+    main.main(["--backend", "sqlite", "analyze", "--matrix", path])
+    assert capsys.readouterr().out == expected
+
+    main.main(["--backend", "sqlite", "report", "--top", "3"])
+    expected = capsys.readouterr().out
+    main.main(["--backend", "sqlite", "report", "--top", "3", "--matrix", path])
+    assert capsys.readouterr().out == expected
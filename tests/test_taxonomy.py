@@ -0,0 +1,88 @@
+import json
+import os
+
+import pytest
+
+from analysis import MatchCleaner, SkillKeyword, SkillMatcher
+from taxonomy import DEFAULT_SUFFIXES, SkillTaxonomy
+
+KEYWORDS = [
+    SkillKeyword("python", [], "technical"),
+    SkillKeyword("docker", [], "technical"),
+    SkillKeyword("spark", [], "technical"),
+    SkillKeyword("rust", [], "technical"),
+    SkillKeyword("communication", ["iletişim"], "soft"),
+]
+
+
+@pytest.fixture
+def match():
+    matcher = SkillMatcher(KEYWORDS, DEFAULT_SUFFIXES)
+    cleaner = MatchCleaner()
+    return lambda text: matcher.match_names(cleaner.clean(text))
+
+
+@pytest.mark.parametrize("text, skill", [
+    ("pythonda deneyim", "python"),
+    ("Python'da deneyim", "python"),
+    ("dockerda çalışmış", "docker"),
+    ("dockerlarin yönetimi", "docker"),
+    ("dockerlarda", "docker"),
+    ("Docker'lar", "docker"),
+    ("İLETİŞİMDE güçlü", "communication"),
+    ("spark ve rust", "spark"),
+])
+def test_suffixed_terms_match(match, text, skill):
+    assert skill in match(text)
+
+
+@pytest.mark.parametrize("text", [
+    "a sparkle of joy", "the rustle of leaves", "a sparkler", "cattle rustlers", "the rustler",
+    "pythonic code", "dockers",
+])
+def test_english_words_are_not_read_as_suffixed_terms(match, text):
+    assert match(text) == set()
+
+
+def test_taxonomy_file_is_reloaded_when_it_changes(tmp_path):
+    path = tmp_path / "skills.json"
+    path.write_text(json.dumps({"categories": {"technical": {"python": ["py"]}}}), encoding="utf-8")
+    taxonomy = SkillTaxonomy(str(path), check_seconds=0)
+    keywords, matcher = taxonomy.current()
+    assert [kw.name for kw in keywords] == ["python"]
+    assert matcher.match_names("pythonda") == {"python"}
+
+    path.write_text(json.dumps({"suffixes": [], "skills": [{"name": "docker"}]}), encoding="utf-8")
+    os.utime(path, ns=(0, 1))
+    keywords, matcher = taxonomy.current()
+    assert [kw.name for kw in keywords] == ["docker"]
+    assert matcher.match_names("dockerda") == set()
+
+    # A broken edit keeps the last good version
+    path.write_text("{", encoding="utf-8")
+    os.utime(path, ns=(0, 2))
+    assert taxonomy.current()[1] is matcher
+
+
+@pytest.mark.parametrize("term, text", [
+    ("node.js", "Node.js deneyimi"),
+    ("c++", "C++ ve C# bilen"),
+    ("c#", "C++ ve C# bilen"),
+    ("ci/cd", "CI/CD süreçleri"),
+    ("ci/cd", "CI / CD süreçleri"),
+])
+def test_terms_with_symbols_match(term, text):
+    matcher = SkillMatcher([SkillKeyword(term, [], "technical")], DEFAULT_SUFFIXES)
+    assert matcher.match_names(MatchCleaner().clean(text)) == {term}
+
+
+def test_symbols_do_not_glue_or_split_other_terms():
+    matcher = SkillMatcher([SkillKeyword(t, [], "technical") for t in ("c", "python", "sql")])
+    cleaner = MatchCleaner()
+    assert matcher.match_names(cleaner.clean("C++ ve C#")) == set()
+    assert matcher.match_names(cleaner.clean("Python+SQL")) == {"python", "sql"}
+
+
+def test_terms_that_can_never_match_are_reported(caplog):
+    SkillMatcher([SkillKeyword("++", [], "technical")])
+    assert "can never match" in caplog.text
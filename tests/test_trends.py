@@ -0,0 +1,17 @@
+import pytest
+
+import main
+from trends import bucket_range
+
+
+def test_bucket_range_needs_at_least_one_bucket():
+    assert len(bucket_range("week", 1)) == 1
+    with pytest.raises(ValueError):
+        bucket_range("week", 0)
+
+
+@pytest.mark.parametrize("last", ["0", "-3"])
+def test_report_rejects_an_empty_trend_window(last, capsys):
+    with pytest.raises(SystemExit):
+        main.main(["--backend", "memory", "report", "--trend", "python", "--last", last])
+    assert "must be at least 1" in capsys.readouterr().err
@@ -0,0 +1,78 @@
+"""
+Skill demand over time.
+
+Every posting gets a `first_seen` timestamp when it is stored. From the
+new postings of each save, save_postings adds +1 to a daily and a weekly
+rollup per skill and per category; trend queries read those rollups only
+and never rescan raw postings.
+"""
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+PERIODS = ("day", "week")
+
+
+# -------------------------------------------------------
+# 1. Buckets
+# -------------------------------------------------------
+def utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def bucket_start(moment, period: str) -> date:
+    """First day of the bucket: the day itself, or the Monday of its week."""
+    day = moment.date() if isinstance(moment, datetime) else moment
+    if period == "day":
+        return day
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    raise ValueError(f"Unknown period '{period}'. Use one of {PERIODS}.")
+
+
+def bucket_range(period: str, last: int, now=None) -> list[str]:
+    """The `last` bucket keys up to and including the current one, oldest first."""
+    if last < 1:
+        raise ValueError(f"last must be at least 1, got {last}.")
+    step = timedelta(days=7 if period == "week" else 1)
+    end = bucket_start(now or utc_now(), period)
+    return [(end - step * i).isoformat() for i in reversed(range(last))]
+
+
+# -------------------------------------------------------
+# 2. Rollup Increments
+# -------------------------------------------------------
+def rollup_increments(postings) -> Counter:
+    """
+    Counts new postings per (period, bucket, kind, name), where kind is
+    "skill" or "category". Postings must carry `first_seen` and tags.
+    Copies tagged with near_duplicate_of are left out, like in every count.
+    """
+    increments = Counter()
+    for posting in postings:
+        seen = posting.get("first_seen")
+        if seen is None or posting.get("near_duplicate_of"):
+            continue
+        if isinstance(seen, str):
+            seen = datetime.fromisoformat(seen)
+        for period in PERIODS:
+            bucket = bucket_start(seen, period).isoformat()
+            for skill in posting.get("skills", []):
+                increments[(period, bucket, "skill", skill)] += 1
+            for category in posting.get("categories", []):
+                increments[(period, bucket, "category", category)] += 1
+    return increments
+
+
+# -------------------------------------------------------
+# 3. Range Queries
+# -------------------------------------------------------
+def trend(db, name: str, period: str = "week", last: int = 52, kind: str = "skill",
+          now=None) -> list[tuple[str, int]]:
+    """
+    Demand for one skill (or category) per bucket, e.g.
+    trend(db, "python", "week", 52) -> [("2025-10-20", 3), ..., ("2026-10-12", 9)].
+    Buckets without new postings are reported as 0.
+    """
+    buckets = bucket_range(period, last, now)
+    counts = db.query_rollups(period, kind, name, buckets[0], buckets[-1])
+    return [(bucket, counts.get(bucket, 0)) for bucket in buckets]